@@ -36,9 +36,19 @@ CONTEXT_SIGNAL_MAX_PER_REPO = 100  # 每個 repo 最多保留的訊號數
 # 警報查詢上限
 MAX_ALERTS_PER_QUERY = 500
 
+# 回應壓縮門檻（小於此大小的回應不壓縮，省下 CPU）
+GZIP_MINIMUM_SIZE_BYTES = 1024
+GZIP_COMPRESS_LEVEL = 6  # 壓縮等級（1–9），6 為速度與壓縮率的折衷
+GZIP_PATH_PREFIXES = ("/api/export",)  # 只壓縮大型匯出回應，本機 API 呼叫不需壓縮
+
 # GitHub 設定
 GITHUB_API_TIMEOUT_SECONDS = 30.0
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = 10  # 共用 client 保留的閒置連線數
+GITHUB_MAX_CONNECTIONS = 20  # 共用 client 同時開啟的連線上限
 GITHUB_TOKEN_ENV_VAR = "GITHUB_TOKEN"  # GitHub token 的環境變數名稱
+GITHUB_RATE_LIMIT_MAX_ATTEMPTS = 3  # 次要速率限制（Retry-After）時 fetch_repo_data 的總嘗試次數
+GITHUB_RETRY_AFTER_MAX_SECONDS = 30  # Retry-After 超過此秒數則不等待，直接放棄
+GITHUB_ETAG_CACHE_MAX_ENTRIES = 512  # get_repo 條件式請求快取保留的 URL 數上限（超過時淘汰最久未用者）
 
 # 驗證
 GITHUB_USERNAME_PATTERN = r"^[a-zA-Z0-9](?:[a-zA-Z0-9]|-(?=[a-zA-Z0-9])){0,38}$"
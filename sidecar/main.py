@@ -20,11 +20,18 @@ from slowapi.errors import RateLimitExceeded
 # 從 .env 檔載入環境變數（必須在讀取環境變數前呼叫）
 load_dotenv()
 
-from constants import APP_VERSION, DEFAULT_FETCH_INTERVAL_MINUTES, GITHUB_TOKEN_ENV_VAR
+from constants import (
+    APP_VERSION,
+    DEFAULT_FETCH_INTERVAL_MINUTES,
+    GITHUB_TOKEN_ENV_VAR,
+    GZIP_COMPRESS_LEVEL,
+    GZIP_MINIMUM_SIZE_BYTES,
+    GZIP_PATH_PREFIXES,
+)
 from db import init_db
 from db.database import get_app_data_dir
 from logging_config import setup_logging
-from middleware import LoggingMiddleware, SessionAuthMiddleware
+from middleware import LoggingMiddleware, PathScopedGZipMiddleware, SessionAuthMiddleware
 from middleware.rate_limit import limiter
 from routers import health, repos, alerts, trends, context, charts, recommendations, categories, early_signals, export, github_auth, discovery, star_history, weekly_summary, comparison, app_settings
 from services.github import GitHubAPIError, GitHubNotFoundError, GitHubRateLimitError, close_github_service
@@ -244,6 +251,15 @@ def get_allowed_origins() -> list[str]:
 
 ALLOWED_ORIGINS = get_allowed_origins()
 
+# 回應壓縮 middleware（最內層，直接包住路由以判斷回應大小；
+# 僅壓縮匯出路由，串流回應如 CSV 匯出會邊產生邊壓縮）
+app.add_middleware(
+    PathScopedGZipMiddleware,
+    path_prefixes=GZIP_PATH_PREFIXES,
+    minimum_size=GZIP_MINIMUM_SIZE_BYTES,
+    compresslevel=GZIP_COMPRESS_LEVEL,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
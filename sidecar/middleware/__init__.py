@@ -2,7 +2,8 @@
 StarScope 中介層元件。
 """
 
+from .compression import PathScopedGZipMiddleware
 from .logging import LoggingMiddleware
 from .session_auth import SessionAuthMiddleware
 
-__all__ = ["LoggingMiddleware", "SessionAuthMiddleware"]
+__all__ = ["LoggingMiddleware", "PathScopedGZipMiddleware", "SessionAuthMiddleware"]
@@ -0,0 +1,39 @@
+"""StarScope 的回應壓縮 middleware。"""
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PathScopedGZipMiddleware:
+    """
+    只對指定路徑前綴的回應套用 gzip 壓縮。
+
+    sidecar 僅供本機桌面端呼叫，頻寬不是瓶頸；一般 API 回應壓縮只會多花 CPU，
+    因此只壓縮匯出等大型回應。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: tuple[str, ...],
+        minimum_size: int,
+        compresslevel: int,
+    ) -> None:
+        """
+        初始化壓縮 middleware。
+
+        Args:
+            app: ASGI 應用程式
+            path_prefixes: 需要壓縮的路徑前綴
+            minimum_size: 小於此大小（bytes）的回應不壓縮
+            compresslevel: gzip 壓縮等級（1–9）
+        """
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.path_prefixes):
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
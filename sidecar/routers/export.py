@@ -1,27 +1,37 @@
 """
 匯出 API 端點。
-支援 JSON 及 CSV 格式匯出追蹤清單。
+支援 JSON、CSV 及 MessagePack 格式匯出追蹤清單。
 """
 
 import csv
 import io
-import json
-from typing import Literal
-
+from collections.abc import AsyncIterator, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from operator import attrgetter, itemgetter
+from typing import Any, Literal
+
+import msgpack
+import orjson
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from db.database import get_db
 from constants import SignalType
-from db.models import Repo, RepoSnapshot
-from services.queries import build_snapshot_map, build_signal_map, build_stars_map, query_trending_repos
+from services.queries import build_signal_map, build_stars_map, query_trending_repos, query_watchlist_rows
 from utils.time import utc_now
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
+def _attachment_headers(stem: str, extension: str, now: datetime) -> dict[str, str]:
+    """產生下載用的 Content-Disposition header（檔名日期與 exported_at 共用同一個時間點）。"""
+    return {"Content-Disposition": f'attachment; filename="starscope_{stem}_{now:%Y%m%d}.{extension}"'}
+
+
 # OpenAPI 文件用回應模型
 class ExportedRepo(BaseModel):
     """匯出的 Repo 資料結構（包含訊號）。"""
@@ -93,57 +103,95 @@ class WatchlistExportResponse(BaseModel):
     })
 
 
-def _build_repo_dict(
-    repo: "Repo",
-    snapshot: "RepoSnapshot | None",
-    signals: dict[str, float]
-) -> dict:
-    """從預先載入的資料建立 repo 字典。"""
-    return {
-        "id": repo.id,
-        "owner": repo.owner,
-        "name": repo.name,
-        "full_name": repo.full_name,
-        "url": repo.url,
-        "description": repo.description,
-        "language": repo.language,
-        "topics": repo.topics,
-        "added_at": repo.added_at.isoformat() if repo.added_at else None,
-        "updated_at": repo.updated_at.isoformat() if repo.updated_at else None,
-        "stars": snapshot.stars if snapshot else None,
-        "forks": snapshot.forks if snapshot else None,
-        "stars_delta_7d": signals.get(SignalType.STARS_DELTA_7D),
-        "stars_delta_30d": signals.get(SignalType.STARS_DELTA_30D),
-        "velocity": signals.get(SignalType.VELOCITY),
-        "acceleration": signals.get(SignalType.ACCELERATION),
-        "trend": signals.get(SignalType.TREND),
-    }
+# 追蹤清單匯出帶出的訊號（在 SQL 端轉置為同名欄位）
+_WATCHLIST_SIGNAL_TYPES = (
+    SignalType.STARS_DELTA_7D,
+    SignalType.STARS_DELTA_30D,
+    SignalType.VELOCITY,
+    SignalType.ACCELERATION,
+    SignalType.TREND,
+)
 
 
-def _get_repos_with_signals(repos: list["Repo"], db: Session) -> list[dict]:
-    """使用批次載入建立含訊號的 repo 字典以避免 N+1 查詢。"""
-    if not repos:
-        return []
+@dataclass(slots=True)
+class _ExportRepoRow:
+    """
+    追蹤清單匯出的一列資料。
 
-    repo_ids = [r.id for r in repos]
+    以 slots dataclass 取代每個 repo 一個 dict；orjson 可原生序列化，
+    欄位順序即 JSON 輸出順序。
+    """
+    id: int
+    owner: str
+    name: str
+    full_name: str
+    url: str
+    description: str | None
+    language: str | None
+    topics: str | None
+    added_at: str | None
+    updated_at: str | None
+    stars: int | None
+    forks: int | None
+    stars_delta_7d: float | None
+    stars_delta_30d: float | None
+    velocity: float | None
+    acceleration: float | None
+    trend: float | None
+
+
+def _build_export_row(row: Row) -> _ExportRepoRow:
+    """從匯出查詢的 Row（含最新快照與訊號欄位）建立匯出列。"""
+    return _ExportRepoRow(
+        id=row.id,
+        owner=row.owner,
+        name=row.name,
+        full_name=row.full_name,
+        url=row.url,
+        description=row.description,
+        language=row.language,
+        topics=row.topics,
+        added_at=row.added_at.isoformat() if row.added_at else None,
+        updated_at=row.updated_at.isoformat() if row.updated_at else None,
+        stars=row.stars,
+        forks=row.forks,
+        stars_delta_7d=row.stars_delta_7d,
+        stars_delta_30d=row.stars_delta_30d,
+        velocity=row.velocity,
+        acceleration=row.acceleration,
+        trend=row.trend,
+    )
 
-    # 以 2 次查詢批次載入所有資料，取代 2N 次查詢
-    snapshots_map = build_snapshot_map(db, repo_ids)
-    signals_map = build_signal_map(db, repo_ids)
 
-    return [
-        _build_repo_dict(
-            repo,
-            snapshots_map.get(repo.id),
-            signals_map.get(repo.id, {})
-        )
-        for repo in repos
-    ]
+def _get_repos_with_signals(db: Session) -> list[_ExportRepoRow]:
+    """
+    建立追蹤清單匯出列。
+
+    repo 欄位、最新快照與訊號在同一次查詢取得，與 repo 數量無關。
+    """
+    return [_build_export_row(row) for row in query_watchlist_rows(db, _WATCHLIST_SIGNAL_TYPES)]
+
+
+def _watchlist_payload(db: Session, now: datetime) -> dict[str, Any]:
+    """建立 JSON 與 MessagePack 匯出共用的追蹤清單內容。"""
+    repos = _get_repos_with_signals(db)
+    return {
+        "exported_at": now.isoformat(),
+        "total": len(repos),
+        "repos": repos,
+    }
+
+
+def _export_row_to_dict(obj: Any) -> dict:
+    """msgpack 的 default hook：將匯出列轉為 dict（msgpack 不支援 dataclass）。"""
+    if isinstance(obj, _ExportRepoRow):
+        return asdict(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
 
 
 @router.get(
     "/watchlist.json",
-    response_class=StreamingResponse,
+    response_class=Response,
     responses={
         200: {
             "description": "JSON 格式的 watchlist 匯出",
@@ -153,27 +201,49 @@ def _get_repos_with_signals(repos: list["Repo"], db: Session) -> list[dict]:
 )
 async def export_watchlist_json(
     db: Session = Depends(get_db)
-) -> StreamingResponse:
+) -> Response:
     """
     將整個追蹤清單匯出為 JSON。
 
     回傳包含所有追蹤 repo 及其訊號（velocity、delta 等）的 JSON 檔案。
     檔名格式：starscope_watchlist_YYYYMMDD.json
     """
-    # noinspection PyTypeChecker
-    repos: list[Repo] = db.query(Repo).order_by(Repo.added_at.desc()).all()
-    data = {
-        "exported_at": utc_now().isoformat(),
-        "total": len(repos),
-        "repos": _get_repos_with_signals(repos, db),
-    }
+    now = utc_now()
+    data = _watchlist_payload(db, now)
 
-    return StreamingResponse(
-        io.StringIO(json.dumps(data, indent=2, ensure_ascii=False)),
+    return Response(
+        content=orjson.dumps(data, option=orjson.OPT_INDENT_2),
         media_type="application/json",
-        headers={
-            "Content-Disposition": f'attachment; filename="starscope_watchlist_{utc_now().strftime("%Y%m%d")}.json"'
+        headers=_attachment_headers("watchlist", "json", now),
+    )
+
+
+@router.get(
+    "/watchlist.msgpack",
+    response_class=Response,
+    responses={
+        200: {
+            "description": "MessagePack 格式的 watchlist 匯出（結構同 JSON 匯出）",
+            "content": {"application/msgpack": {"schema": {"type": "string", "format": "binary"}}},
         }
+    }
+)
+async def export_watchlist_msgpack(
+    db: Session = Depends(get_db)
+) -> Response:
+    """
+    將整個追蹤清單匯出為 MessagePack。
+
+    內容與 JSON 匯出相同，供程式化用戶端使用；數值欄位以二進位編碼，體積較小。
+    檔名格式：starscope_watchlist_YYYYMMDD.msgpack
+    """
+    now = utc_now()
+    data = _watchlist_payload(db, now)
+
+    return Response(
+        content=msgpack.packb(data, default=_export_row_to_dict, use_bin_type=True),
+        media_type="application/msgpack",
+        headers=_attachment_headers("watchlist", "msgpack", now),
     )
 
 
@@ -184,6 +254,30 @@ CSV_COLUMNS = [
 ]
 
 
+def _csv_header_line(columns: list[str]) -> str:
+    """產生與 csv.writer 輸出一致的 header 列（欄位名稱無需跳脫）。"""
+    return ",".join(columns) + "\r\n"
+
+
+CSV_HEADER_LINE = _csv_header_line(CSV_COLUMNS)
+
+
+async def _iter_csv_rows(rows: Iterable[Sequence], header_line: str) -> AsyncIterator[str]:
+    """
+    先送出預先產生的 header，再逐列產生 CSV 文字，避免先在記憶體中組出整份檔案。
+
+    rows 為依欄位順序排列的值序列。
+    """
+    yield header_line
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
 @router.get(
     "/watchlist.csv",
     response_class=StreamingResponse,
@@ -213,23 +307,13 @@ async def export_watchlist_csv(
     欄位：full_name, owner, name, url, language, description, stars, forks, velocity, stars_delta_7d, stars_delta_30d, acceleration, trend, added_at
     檔名格式：starscope_watchlist_YYYYMMDD.csv
     """
-    # noinspection PyTypeChecker
-    repos: list[Repo] = db.query(Repo).order_by(Repo.added_at.desc()).all()
-    repo_dicts = _get_repos_with_signals(repos, db)
+    now = utc_now()
+    repo_rows = _get_repos_with_signals(db)
 
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, extrasaction="ignore")
-    writer.writeheader()
-    for repo_dict in repo_dicts:
-        writer.writerow(repo_dict)
-
-    output.seek(0)
     return StreamingResponse(
-        output,
+        _iter_csv_rows(map(attrgetter(*CSV_COLUMNS), repo_rows), CSV_HEADER_LINE),
         media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="starscope_watchlist_{utc_now().strftime("%Y%m%d")}.csv"'
-        }
+        headers=_attachment_headers("watchlist", "csv", now),
     )
 
 
@@ -280,29 +364,30 @@ TRENDS_CSV_COLUMNS = [
     "acceleration", "forks_delta_7d", "issues_delta_7d",
 ]
 
+TRENDS_CSV_HEADER_LINE = _csv_header_line(TRENDS_CSV_COLUMNS)
 
-@router.get("/trends.json", response_class=StreamingResponse)
+
+@router.get("/trends.json", response_class=Response)
 async def export_trends_json(
     sort_by: TrendsSortBy = Query("velocity", description="Sort metric"),
     limit: int = Query(50, ge=1, le=200, description="Maximum results"),
     language: str | None = Query(None, description="Filter by language"),
     min_stars: int | None = Query(None, ge=0, description="Minimum stars"),
     db: Session = Depends(get_db),
-) -> StreamingResponse:
+) -> Response:
     """匯出趨勢 repo 為 JSON。"""
+    now = utc_now()
     repos = _build_trending_repo_dicts(query_trending_repos(db, sort_by, limit, language, min_stars), db)
     data = {
-        "exported_at": utc_now().isoformat(),
+        "exported_at": now.isoformat(),
         "sort_by": sort_by,
         "total": len(repos),
         "repos": repos,
     }
-    return StreamingResponse(
-        io.StringIO(json.dumps(data, indent=2, ensure_ascii=False)),
+    return Response(
+        content=orjson.dumps(data, option=orjson.OPT_INDENT_2),
         media_type="application/json",
-        headers={
-            "Content-Disposition": f'attachment; filename="starscope_trends_{utc_now().strftime("%Y%m%d")}.json"'
-        }
+        headers=_attachment_headers("trends", "json", now),
     )
 
 
@@ -315,19 +400,12 @@ async def export_trends_csv(
     db: Session = Depends(get_db),
 ) -> StreamingResponse:
     """匯出趨勢 repo 為 CSV。"""
+    now = utc_now()
     repos = _build_trending_repo_dicts(query_trending_repos(db, sort_by, limit, language, min_stars), db)
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=TRENDS_CSV_COLUMNS, extrasaction="ignore")
-    writer.writeheader()
-    for repo_dict in repos:
-        writer.writerow(repo_dict)
-    output.seek(0)
     return StreamingResponse(
-        output,
+        _iter_csv_rows(map(itemgetter(*TRENDS_CSV_COLUMNS), repos), TRENDS_CSV_HEADER_LINE),
         media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="starscope_trends_{utc_now().strftime("%Y%m%d")}.csv"'
-        }
+        headers=_attachment_headers("trends", "csv", now),
     )
 
 
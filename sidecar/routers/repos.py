@@ -33,7 +33,6 @@ from schemas import (
 )
 from schemas.response import ApiResponse, success_response
 from services.github import (
-    GitHubService,
     GitHubAPIError,
     GitHubNotFoundError,
     get_github_service,
@@ -296,6 +295,11 @@ async def fetch_all_repos(request: Request, db: Session = Depends(get_db)) -> di
                 db.rollback()
                 logger.error(f"[Repo] {repo.full_name} 重試後仍發生 GitHub API 錯誤: {e}", exc_info=True)
                 failed_count += 1
+            except Exception as e:
+                # 未預期的錯誤：回滾此 repo 並繼續處理其他 repos，保留已完成的更新
+                db.rollback()
+                logger.error(f"[Repo] {repo.full_name} 更新時發生未預期錯誤: {e}", exc_info=True)
+                failed_count += 1
 
         repo_list = _build_repo_list_response(db)
         return success_response(
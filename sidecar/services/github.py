@@ -3,15 +3,28 @@ GitHub API 服務。
 負責從 GitHub 取得 repo 資料。
 """
 
+import asyncio
+import copy
 import logging
 import os
+import random
 import threading
+from collections import OrderedDict
+from types import MappingProxyType
 
 import httpx
 from sqlalchemy.exc import SQLAlchemyError
 from keyring.errors import KeyringError
 
-from constants import GITHUB_API_TIMEOUT_SECONDS, GITHUB_TOKEN_ENV_VAR
+from constants import (
+    GITHUB_API_TIMEOUT_SECONDS,
+    GITHUB_ETAG_CACHE_MAX_ENTRIES,
+    GITHUB_MAX_CONNECTIONS,
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+    GITHUB_RATE_LIMIT_MAX_ATTEMPTS,
+    GITHUB_RETRY_AFTER_MAX_SECONDS,
+    GITHUB_TOKEN_ENV_VAR,
+)
 from db.models import AppSettingKey
 
 logger = logging.getLogger(__name__)
@@ -29,9 +42,16 @@ class GitHubAPIError(Exception):
 
 class GitHubRateLimitError(GitHubAPIError):
     """GitHub API 速率限制超過時拋出。"""
-    def __init__(self, message: str, status_code: int | None = None, reset_at: int | None = None) -> None:
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        reset_at: int | None = None,
+        retry_after: int | None = None,
+    ) -> None:
         super().__init__(message, status_code)
         self.reset_at = reset_at  # 速率限制重置的 Unix timestamp
+        self.retry_after = retry_after  # 次要速率限制的 Retry-After 秒數
 
 
 class GitHubNotFoundError(GitHubAPIError):
@@ -88,6 +108,7 @@ def _check_github_errors(
                     f"GitHub API rate limit exceeded (remaining: {remaining})",
                     status_code=403,
                     reset_at=reset_at,
+                    retry_after=int(retry_after) if retry_after and retry_after.isdigit() else None,
                 )
             logger.warning(f"[GitHub API] 速率限制: {context}")
             return False
@@ -149,17 +170,41 @@ def handle_github_list_response(
 
 
 class GitHubService:
-    def __init__(self, token: str | None = None, timeout: float = GITHUB_API_TIMEOUT_SECONDS) -> None:
+    def __init__(
+        self,
+        token: str | None = None,
+        timeout: float = GITHUB_API_TIMEOUT_SECONDS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
         self.token = token
         self.timeout = timeout
-        self.headers = build_github_headers(token)
+        # 建構時固定一次，唯讀以避免被意外修改
+        self.headers = MappingProxyType(build_github_headers(token))
+        # 自訂 transport（如測試用的 httpx.MockTransport）；None 則使用預設連線池
+        self._transport = transport
         self._client: httpx.AsyncClient | None = None
+        # get_repo 的條件式請求快取：URL → (ETag, 回應內容)，以 LRU 限制大小
+        self._etag_cache: OrderedDict[str, tuple[str, dict]] = OrderedDict()
 
     @property
     def client(self) -> httpx.AsyncClient:
-        """取得共用的 httpx.AsyncClient（連線池復用）。"""
+        """
+        取得共用的 httpx.AsyncClient（預設帶入 GitHub headers）。
+
+        啟用 HTTP/2 與 keep-alive 連線池，後續請求可重用同一條 TLS 連線，
+        並讓並行的 repo 抓取在單一連線上多工。
+        """
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=dict(self.headers),
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+                    max_connections=GITHUB_MAX_CONNECTIONS,
+                ),
+                transport=self._transport,
+            )
         return self._client
 
     async def aclose(self) -> None:
@@ -177,15 +222,30 @@ class GitHubService:
             GitHubRateLimitError: 速率限制超過（403）
             GitHubAPIError: 其他 API 錯誤
         """
+        url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+        # 帶上次的 ETag 發出條件式請求；304 不計入速率限制，也不需傳輸內容
+        cached = self._etag_cache.get(url)
         response = await self.client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}",
-            headers=self.headers,
+            url,
+            headers={"If-None-Match": cached[0]} if cached else None,
         )
-        return handle_github_response(
+        if cached and response.status_code == 304:
+            self._etag_cache.move_to_end(url)
+            # 回傳複本，避免呼叫端修改內容污染之後的 304 回應
+            return copy.deepcopy(cached[1])
+
+        data = handle_github_response(
             response,
             raise_on_error=True,
             context=f"{owner}/{repo}"
         )
+        etag = response.headers.get("ETag")
+        if etag and data is not None:
+            self._etag_cache[url] = (etag, copy.deepcopy(data))
+            self._etag_cache.move_to_end(url)
+            if len(self._etag_cache) > GITHUB_ETAG_CACHE_MAX_ENTRIES:
+                self._etag_cache.popitem(last=False)
+        return data
 
     async def get_repo_stargazers_count(self, owner: str, repo: str) -> int:
         """
@@ -253,7 +313,6 @@ class GitHubService:
 
         response = await self.client.get(
             f"{GITHUB_API_BASE}/search/repositories",
-            headers=self.headers,
             params={
                 "q": full_query,
                 "sort": sort,
@@ -305,11 +364,8 @@ class GitHubService:
             )
             return []
 
-        # 特殊 header 以取得 starred_at 時間戳記
-        headers = {
-            **self.headers,
-            "Accept": "application/vnd.github.star+json",
-        }
+        # 特殊 header 以取得 starred_at 時間戳記（覆寫 client 預設的 Accept）
+        headers = {"Accept": "application/vnd.github.star+json"}
 
         all_stargazers: list[dict] = []
         max_pages = 100  # 安全上限：最多 10,000 顆星
@@ -353,7 +409,6 @@ class GitHubService:
         for page in range(1, max_pages + 1):
             response = await self.client.get(
                 f"{GITHUB_API_BASE}/user/starred",
-                headers=self.headers,
                 params={
                     "per_page": per_page,
                     "page": page,
@@ -435,7 +490,8 @@ def reset_github_service() -> None:
     """
     重設預設的 GitHub service 實例。
 
-    用於測試或 token 需要刷新時。
+    用於測試或 token 需要刷新時。只丟棄 singleton 參照，不關閉舊實例：
+    仍持有舊參照的進行中請求可繼續使用其連線池，之後由 GC 回收。
     """
     global _default_service
     with _service_lock:
@@ -446,22 +502,41 @@ async def fetch_repo_data(owner: str, repo: str) -> dict | None:
     """
     從 GitHub 取得 repo 資料。
     請求失敗時回傳 None。
+
+    次要速率限制（帶 Retry-After）會依指示等待後重試，最多
+    GITHUB_RATE_LIMIT_MAX_ATTEMPTS 次；主要速率限制需等到整點重置，
+    短時間重試無效，直接回傳 None。
     """
-    try:
-        service = get_github_service()
-        return await service.get_repo(owner, repo)
-    except GitHubNotFoundError:
-        logger.warning(f"[GitHub API] 找不到 repo: {owner}/{repo}")
-        return None
-    except GitHubRateLimitError as e:
-        logger.error(f"[GitHub API] GitHub 速率限制已超出: {e}", exc_info=True)
-        return None
-    except GitHubAPIError as e:
-        logger.error(f"[GitHub API] {owner}/{repo} API 錯誤: {e}", exc_info=True)
-        return None
-    except httpx.TimeoutException:
-        logger.error(f"[GitHub API] 抓取 {owner}/{repo} 逾時", exc_info=True)
-        return None
-    except httpx.RequestError as e:
-        logger.error(f"[GitHub API] 抓取 {owner}/{repo} 網路錯誤: {e}", exc_info=True)
-        return None
+    for attempt in range(1, GITHUB_RATE_LIMIT_MAX_ATTEMPTS + 1):
+        try:
+            service = get_github_service()
+            return await service.get_repo(owner, repo)
+        except GitHubNotFoundError:
+            logger.warning(f"[GitHub API] 找不到 repo: {owner}/{repo}")
+            return None
+        except GitHubRateLimitError as e:
+            retry_after = e.retry_after
+            if (
+                retry_after is None
+                or retry_after > GITHUB_RETRY_AFTER_MAX_SECONDS
+                or attempt == GITHUB_RATE_LIMIT_MAX_ATTEMPTS
+            ):
+                logger.error(f"[GitHub API] GitHub 速率限制已超出: {e}", exc_info=True)
+                return None
+            # 加上少量 jitter，避免並行抓取同時醒來再次觸發限制
+            delay = retry_after + random.uniform(0, 1)
+            logger.warning(
+                f"[GitHub API] {owner}/{repo} 觸發次要速率限制，"
+                f"{delay:.1f} 秒後重試（第 {attempt} 次）"
+            )
+            await asyncio.sleep(delay)
+        except GitHubAPIError as e:
+            logger.error(f"[GitHub API] {owner}/{repo} API 錯誤: {e}", exc_info=True)
+            return None
+        except httpx.TimeoutException:
+            logger.error(f"[GitHub API] 抓取 {owner}/{repo} 逾時", exc_info=True)
+            return None
+        except httpx.RequestError as e:
+            logger.error(f"[GitHub API] 抓取 {owner}/{repo} 網路錯誤: {e}", exc_info=True)
+            return None
+    return None
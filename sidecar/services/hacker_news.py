@@ -108,8 +108,14 @@ async def _execute_hn_query(
 class HackerNewsService:
     """透過 Algolia API 搜尋 Hacker News 的服務。"""
 
-    def __init__(self, timeout: float = HN_API_TIMEOUT_SECONDS) -> None:
+    def __init__(
+        self,
+        timeout: float = HN_API_TIMEOUT_SECONDS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
         self.timeout = timeout
+        # 自訂 transport（如測試用的 httpx.MockTransport）；None 則使用預設連線
+        self._transport = transport
 
     async def search_repo(self, repo_name: str, owner: str) -> list[HNStory]:
         """
@@ -134,7 +140,7 @@ class HackerNewsService:
         # 先搜尋完整名稱（更精確），再搜尋 repo 名稱
         queries = [f"{owner}/{repo_name}", repo_name]
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self._transport) as client:
             for query in queries:
                 new_stories, new_errors = await _execute_hn_query(client, query, seen_ids)
                 stories.extend(new_stories)
@@ -5,7 +5,9 @@
 
 from __future__ import annotations
 
-from sqlalchemy import desc, func
+from collections.abc import Sequence
+
+from sqlalchemy import Row, case, desc, func
 from sqlalchemy.orm import Session, Query, aliased
 from sqlalchemy.sql.selectable import Subquery
 
@@ -80,22 +82,20 @@ def build_signal_map(
     Returns:
         {repo_id: {signal_type: value}}
     """
-    query = db.query(Signal)
+    # 只取需要的欄位，避免建立 ORM 實體
+    query = db.query(Signal.repo_id, Signal.signal_type, Signal.value)
 
     if repo_ids is not None:
         if not repo_ids:
             return {}
         query = query.filter(Signal.repo_id.in_(repo_ids))
 
-    all_signals = query.all()
     signal_map: dict[int, dict[str, float]] = {}
 
-    for signal in all_signals:
-        rid: int = signal.repo_id
+    for rid, signal_type, value in query.all():
         if rid not in signal_map:
             signal_map[rid] = {}
-        # noinspection PyTypeChecker
-        signal_map[rid][str(signal.signal_type)] = float(signal.value)
+        signal_map[rid][str(signal_type)] = float(value)
 
     return signal_map
 
@@ -198,6 +198,71 @@ def build_stars_map(
     return dict(results)  # type: ignore[arg-type]
 
 
+def _build_signal_pivot_subquery(db: Session, signal_types: Sequence[str]) -> Subquery:
+    """
+    建立子查詢，以條件聚合將 signals 轉為每個 repo 一列。
+
+    每個訊號類型成為一個同名欄位（MAX(CASE WHEN ...)），
+    取代載入 N 筆 Signal 後在 Python 端分組。
+    """
+    return (
+        db.query(
+            Signal.repo_id,
+            *[
+                func.max(case((Signal.signal_type == signal_type, Signal.value))).label(signal_type)
+                for signal_type in signal_types
+            ],
+        )
+        .filter(Signal.signal_type.in_(signal_types))
+        .group_by(Signal.repo_id)
+        .subquery()
+    )
+
+
+def query_watchlist_rows(db: Session, signal_types: Sequence[str]) -> list[Row]:
+    """
+    以單一查詢取得匯出所需的 repo 欄位、最新快照的 stars/forks 與訊號值。
+
+    只選取匯出用到的欄位（回傳 Row 而非 ORM 實體）；最新快照與
+    轉置後的訊號皆以 LEFT JOIN 取得。
+
+    Args:
+        db: 資料庫 session
+        signal_types: 要帶出的訊號類型，各自成為同名欄位
+
+    Returns:
+        依加入時間新到舊排序的 Row 列表；缺少快照或訊號時對應欄位為 None。
+    """
+    snapshot_subq = _build_latest_snapshot_subquery(db)
+    signal_subq = _build_signal_pivot_subquery(db, signal_types)
+    return (
+        db.query(
+            Repo.id,
+            Repo.owner,
+            Repo.name,
+            Repo.full_name,
+            Repo.url,
+            Repo.description,
+            Repo.language,
+            Repo.topics,
+            Repo.added_at,
+            Repo.updated_at,
+            RepoSnapshot.stars,
+            RepoSnapshot.forks,
+            *[signal_subq.c[signal_type] for signal_type in signal_types],
+        )
+        .outerjoin(snapshot_subq, snapshot_subq.c.repo_id == Repo.id)
+        .outerjoin(
+            RepoSnapshot,
+            (RepoSnapshot.repo_id == Repo.id) &
+            (RepoSnapshot.snapshot_date == snapshot_subq.c.max_date)
+        )
+        .outerjoin(signal_subq, signal_subq.c.repo_id == Repo.id)
+        .order_by(Repo.added_at.desc())
+        .all()
+    )
+
+
 def get_snapshot_for_repo(
     repo_id: int,
     db: Session,
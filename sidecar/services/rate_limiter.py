@@ -8,7 +8,6 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -16,6 +15,7 @@ from tenacity import (
     retry_if_exception,
     before_sleep_log,
 )
+from tenacity.wait import wait_base
 
 from services.github import (
     GitHubService,
@@ -43,22 +43,24 @@ def _should_retry_github_error(exception: BaseException) -> bool:
     return isinstance(exception, (GitHubRateLimitError, GitHubAPIError))
 
 
-def create_github_retry_decorator(max_attempts: int = 5) -> Any:
+def create_github_retry_decorator(max_attempts: int = 5, wait: wait_base | None = None) -> Any:
     """
     為 GitHub API 呼叫建立重試裝飾器。
 
-    使用帶 jitter 的指數退避：
+    預設使用帶 jitter 的指數退避：
     - 初始等待：4 秒
     - 最大等待：60 秒
     - Jitter：隨機變化以避免 thundering herd
 
+    可傳入 wait 覆寫等待策略（例如測試時使用 wait_none()）。
+
     會重試：
     - GitHubRateLimitError (403)
     - GitHubAPIError（暫時性錯誤，排除 404）
     """
     return retry(
         retry=retry_if_exception(_should_retry_github_error),
-        wait=wait_exponential_jitter(initial=4, max=60, jitter=2),
+        wait=wait if wait is not None else wait_exponential_jitter(initial=4, max=60, jitter=2),
         stop=stop_after_attempt(max_attempts),
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
@@ -88,3 +90,4 @@ async def fetch_repo_with_retry(github: GitHubService, owner: str, name: str) ->
         GitHubAPIError: 重試次數耗盡後拋出
     """
     return await github.get_repo(owner, name)
+
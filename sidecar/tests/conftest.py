@@ -4,13 +4,14 @@ Pytest fixtures for StarScope tests.
 
 import os
 import sys
+from contextlib import contextmanager
 from typing import Generator
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from constants import SignalType
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, create_engine, event, insert, select
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
@@ -25,66 +26,122 @@ from db.database import get_db
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def test_engine():
-    """Create a test database engine."""
+    """
+    Create the test database engine and schema once per session (per xdist worker).
+
+    Each test runs inside an outer transaction on this engine that is rolled
+    back afterwards (see test_connection), so the schema never needs rebuilding.
+    """
     engine = create_engine(
         SQLALCHEMY_TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    # pysqlite 預設自行管理交易，會吞掉 SAVEPOINT；改由 SQLAlchemy 發出 BEGIN
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def test_db(test_engine) -> Generator[Session, None, None]:
-    """Create a test database session."""
-    testing_session_local = sessionmaker(
-        autocommit=False, autoflush=False, expire_on_commit=False, bind=test_engine
+def test_connection(test_engine) -> Generator[Connection, None, None]:
+    """Open a connection with an outer transaction that is rolled back after the test."""
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="function")
+def test_session_local(test_connection):
+    """
+    Create a session factory bound to the test connection.
+
+    commit()/rollback() inside tests and services only touch a SAVEPOINT, so
+    everything is discarded when the outer transaction rolls back.
+    """
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=test_connection,
+        join_transaction_mode="create_savepoint",
     )
-    db = testing_session_local()
+
+
+@pytest.fixture(scope="function")
+def test_db(test_session_local) -> Generator[Session, None, None]:
+    """Create a test database session."""
+    db = test_session_local()
     try:
         yield db
     finally:
         db.close()
 
 
-@pytest.fixture(scope="function")
-def test_session_local(test_engine):
-    """Create a session factory bound to the test engine."""
-    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=test_engine)
+@contextmanager
+def _mock_lifespan_dependencies() -> Generator[None, None, None]:
+    """
+    Mock the names the app lifespan calls so startup/shutdown don't touch the
+    real database or start background jobs.
+
+    Patches target main's own references and are only active while the
+    lifespan runs, so tests calling the real scheduler functions get them.
+    """
+    with patch("main.init_db"), \
+         patch("main.start_scheduler", return_value=None), \
+         patch("main.stop_scheduler", new_callable=AsyncMock), \
+         patch("main.trigger_fetch_now", new_callable=AsyncMock):
+        yield
+
+
+@pytest.fixture(scope="session")
+def _app_client() -> Generator[TestClient, None, None]:
+    """Start the app (and its lifespan) once per session and share the TestClient."""
+    from main import app
+
+    test_client = TestClient(app)
+    with _mock_lifespan_dependencies():
+        test_client.__enter__()
+    try:
+        yield test_client
+    finally:
+        with _mock_lifespan_dependencies():
+            test_client.__exit__(None, None, None)
 
 
 @pytest.fixture(scope="function")
-def client(test_db, test_session_local) -> Generator[TestClient, None, None]:
+def client(_app_client, test_db, test_session_local) -> Generator[TestClient, None, None]:
     """
-    Create a test client with database override.
-    Mocks the scheduler to prevent background tasks during tests.
+    Return the shared test client wired to this test's database session.
     Also patches SessionLocal to use the test database for services that bypass DI.
     """
-    # Mock scheduler, init_db, and trigger_fetch_now to prevent lifespan
-    # from interfering with the test session's SQLite connection.
-    # Also patch SessionLocal so services like settings.py use test DB.
-    with patch("services.scheduler.start_scheduler") as mock_start, \
-         patch("services.scheduler.stop_scheduler", new_callable=AsyncMock) as mock_stop, \
-         patch("services.scheduler.trigger_fetch_now", return_value=None), \
-         patch("main.init_db"), \
-         patch("db.database.SessionLocal", test_session_local), \
-         patch("services.settings.SessionLocal", test_session_local):
-        mock_start.return_value = None
-
-        # Import app after patching to ensure patches take effect
-        from main import app
+    app = _app_client.app
 
-        def override_get_db():
-            yield test_db
+    def override_get_db():
+        yield test_db
 
+    with patch("db.database.SessionLocal", test_session_local), \
+         patch("services.settings.SessionLocal", test_session_local):
         app.dependency_overrides[get_db] = override_get_db
-        with TestClient(app) as test_client:
-            yield test_client
-        app.dependency_overrides.clear()
+        try:
+            yield _app_client
+        finally:
+            app.dependency_overrides.clear()
 
 
 @pytest.fixture
@@ -93,6 +150,7 @@ def mock_repo(test_db):
     from db.models import Repo
     from utils.time import utc_now
 
+    now = utc_now()
     repo = Repo(
         owner="testowner",
         name="testrepo",
@@ -103,9 +161,9 @@ def mock_repo(test_db):
         default_branch="main",
         language="Python",
         topics='["testing", "python"]',
-        created_at=utc_now(),
-        added_at=utc_now(),
-        updated_at=utc_now(),
+        created_at=now,
+        added_at=now,
+        updated_at=now,
     )
     test_db.add(repo)
     test_db.commit()
@@ -119,25 +177,31 @@ def mock_repo_with_snapshots(test_db, mock_repo):
     from db.models import RepoSnapshot
     from utils.time import utc_now
 
-    today = utc_now().date()
-    snapshots = []
-
-    # Create 30 days of snapshots with growing stars
-    for i in range(30, 0, -1):
-        snapshot = RepoSnapshot(
-            repo_id=mock_repo.id,
-            stars=1000 + (30 - i) * 50,  # Growing from 1000 to 2450
-            forks=100 + (30 - i) * 5,
-            watchers=50,
-            open_issues=10,
-            snapshot_date=today - timedelta(days=i),
-            fetched_at=utc_now() - timedelta(days=i),
-        )
-        test_db.add(snapshot)
-        snapshots.append(snapshot)
-
+    now = utc_now()
+    today = now.date()
+
+    # Create 30 days of snapshots with growing stars, inserted in one executemany
+    test_db.execute(insert(RepoSnapshot), [
+        {
+            "repo_id": mock_repo.id,
+            "stars": 1000 + (30 - i) * 50,  # Growing from 1000 to 2450
+            "forks": 100 + (30 - i) * 5,
+            "watchers": 50,
+            "open_issues": 10,
+            "snapshot_date": today - timedelta(days=i),
+            "fetched_at": now - timedelta(days=i),
+        }
+        for i in range(30, 0, -1)
+    ])
     test_db.commit()
-    return mock_repo, snapshots
+
+    # Load them back as ORM objects in one query, oldest first
+    snapshots = test_db.scalars(
+        select(RepoSnapshot)
+        .where(RepoSnapshot.repo_id == mock_repo.id)
+        .order_by(RepoSnapshot.snapshot_date)
+    ).all()
+    return mock_repo, list(snapshots)
 
 
 @pytest.fixture
@@ -163,32 +227,38 @@ def mock_multiple_repos(test_db):
     from db.models import Repo
     from utils.time import utc_now
 
-    repos = []
     repo_data = [
         ("facebook", "react", "JavaScript"),
         ("vuejs", "vue", "TypeScript"),
         ("angular", "angular", "TypeScript"),
     ]
 
-    for i, (owner, name, lang) in enumerate(repo_data):
-        repo = Repo(
-            owner=owner,
-            name=name,
-            full_name=f"{owner}/{name}",
-            url=f"https://github.com/{owner}/{name}",
-            description=f"The {name} framework",
-            github_id=100001 + i,
-            default_branch="main",
-            language=lang,
-            created_at=utc_now(),
-            added_at=utc_now(),
-            updated_at=utc_now(),
-        )
-        test_db.add(repo)
-        repos.append(repo)
-
+    now = utc_now()
+    github_ids = [100001 + i for i in range(len(repo_data))]
+    # Insert all repos in one executemany
+    test_db.execute(insert(Repo), [
+        {
+            "owner": owner,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "url": f"https://github.com/{owner}/{name}",
+            "description": f"The {name} framework",
+            "github_id": github_id,
+            "default_branch": "main",
+            "language": lang,
+            "created_at": now,
+            "added_at": now,
+            "updated_at": now,
+        }
+        for github_id, (owner, name, lang) in zip(github_ids, repo_data)
+    ])
     test_db.commit()
-    return repos
+
+    # Load them back as ORM objects in one query, in insertion order
+    repos = test_db.scalars(
+        select(Repo).where(Repo.github_id.in_(github_ids)).order_by(Repo.id)
+    ).all()
+    return list(repos)
 
 
 @pytest.fixture
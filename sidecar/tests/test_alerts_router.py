@@ -24,7 +24,6 @@ def _create_rule(test_db, mock_repo=None, **overrides):
     rule = AlertRule(**defaults)
     test_db.add(rule)
     test_db.commit()
-    test_db.refresh(rule)
     return rule
 
 
@@ -39,7 +38,6 @@ def _create_triggered_alert(test_db, rule, repo):
     )
     test_db.add(alert)
     test_db.commit()
-    test_db.refresh(alert)
     return alert
 
 
@@ -56,16 +54,11 @@ class TestSignalTypes:
         assert isinstance(data, list)
         assert len(data) == 9
 
-        type_values = [item["type"] for item in data]
-        assert "stars_delta_7d" in type_values
-        assert "stars_delta_30d" in type_values
-        assert "velocity" in type_values
-        assert "acceleration" in type_values
-        assert "trend" in type_values
-        assert "forks_delta_7d" in type_values
-        assert "forks_delta_30d" in type_values
-        assert "issues_delta_7d" in type_values
-        assert "issues_delta_30d" in type_values
+        type_values = {item["type"] for item in data}
+        assert type_values == {
+            "stars_delta_7d", "stars_delta_30d", "velocity", "acceleration", "trend",
+            "forks_delta_7d", "forks_delta_30d", "issues_delta_7d", "issues_delta_30d",
+        }
 
         # Verify each item has required fields
         for item in data:
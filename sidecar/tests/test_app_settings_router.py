@@ -24,7 +24,6 @@ def reset_anomaly_detector_globals():
     for attr, value in original.items():
         setattr(_detector, attr, value)
 from db.models import AppSetting, AppSettingKey, Repo, RepoSnapshot
-from utils.time import utc_now
 
 
 class TestGetFetchInterval:
@@ -2,7 +2,6 @@
 
 import sqlite3
 import time
-from pathlib import Path
 
 import pytest
 
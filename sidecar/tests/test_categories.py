@@ -2,6 +2,8 @@
 Tests for category endpoints.
 """
 
+import pytest
+
 # ID guaranteed not to exist in the test database
 NONEXISTENT_CATEGORY_ID = 99999
 
@@ -59,9 +61,10 @@ class TestCategoryEndpoints:
         })
         assert response.status_code == 422  # Validation error
 
-    def test_get_category_not_found(self, client):
-        """Test getting a nonexistent category."""
-        response = client.get(f"/api/categories/{NONEXISTENT_CATEGORY_ID}")
+    @pytest.mark.parametrize("suffix", ["", "/repos"], ids=["category", "repos"])
+    def test_get_category_not_found(self, client, suffix):
+        """Test that category GET endpoints return 404 for a nonexistent category."""
+        response = client.get(f"/api/categories/{NONEXISTENT_CATEGORY_ID}{suffix}")
         assert response.status_code == 404
 
     def test_delete_category_not_found(self, client):
@@ -76,11 +79,6 @@ class TestCategoryEndpoints:
         })
         assert response.status_code == 404
 
-    def test_get_category_repos_not_found(self, client):
-        """Test getting repos from nonexistent category."""
-        response = client.get(f"/api/categories/{NONEXISTENT_CATEGORY_ID}/repos")
-        assert response.status_code == 404
-
     def test_category_with_parent(self, client):
         """Test creating a category with a parent."""
         # Create parent category
@@ -205,15 +203,17 @@ class TestCategoryUpdate:
 class TestCategoryDelete:
     """Test cases for category deletion."""
 
-    def test_delete_category_success(self, client, mock_category):
+    def test_delete_category_success(self, client, test_db, mock_category):
         """Test deleting an existing category."""
-        response = client.delete(f"/api/categories/{mock_category.id}")
+        from db.models import Category
+
+        category_id = mock_category.id
+        response = client.delete(f"/api/categories/{category_id}")
         assert response.status_code == 200
         assert response.json()["data"]["status"] == "ok"
 
         # Verify category is gone
-        response = client.get(f"/api/categories/{mock_category.id}")
-        assert response.status_code == 404
+        assert test_db.query(Category).filter(Category.id == category_id).count() == 0
 
 
 class TestCategoryRepoOperations:
@@ -2,6 +2,8 @@
 Tests for chart endpoints.
 """
 
+import pytest
+
 
 class TestChartEndpoints:
     """Test cases for /api/charts endpoints."""
@@ -11,12 +13,12 @@ class TestChartEndpoints:
         response = client.get("/api/charts/99999/stars")
         assert response.status_code == 404
 
-    def test_get_stars_chart_valid_time_ranges(self, client, mock_repo_with_snapshots):
+    @pytest.mark.parametrize("time_range", ["7d", "30d", "90d"])
+    def test_get_stars_chart_valid_time_ranges(self, client, mock_repo_with_snapshots, time_range):
         """Test that valid time_range values are accepted with real data."""
         repo, _ = mock_repo_with_snapshots
-        for time_range in ["7d", "30d", "90d"]:
-            response = client.get(f"/api/charts/{repo.id}/stars?time_range={time_range}")
-            assert response.status_code == 200
+        response = client.get(f"/api/charts/{repo.id}/stars?time_range={time_range}")
+        assert response.status_code == 200
 
     def test_get_stars_chart_invalid_time_range(self, client, mock_repo_with_snapshots):
         """Test that invalid time_range returns 422."""
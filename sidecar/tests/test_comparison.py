@@ -138,8 +138,7 @@ class TestComparisonEndpoint:
         data = response.json()["data"]
 
         # First data point should be 0% (baseline)
-        for repo_data in data["repos"]:
-            assert repo_data["data_points"][0]["stars"] == 0
+        assert {repo_data["data_points"][0]["stars"] for repo_data in data["repos"]} == {0}
 
     def test_time_range_all(self, client, mock_multiple_repos, test_db):
         """Test 'all' time range includes all snapshots."""
@@ -166,8 +165,7 @@ class TestComparisonEndpoint:
         assert response.status_code == 200
         data = response.json()["data"]
         # Should have all 3 snapshots per repo
-        for repo_data in data["repos"]:
-            assert len(repo_data["data_points"]) == 3
+        assert [len(repo_data["data_points"]) for repo_data in data["repos"]] == [3, 3]
 
     def test_invalid_time_range(self, client, mock_multiple_repos):
         """Test invalid time_range returns 422."""
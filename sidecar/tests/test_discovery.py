@@ -2,53 +2,74 @@
 Tests for discovery (GitHub search) endpoints.
 """
 
-from unittest.mock import patch, AsyncMock
+from unittest.mock import AsyncMock
 
-from services.github import GitHubRateLimitError, GitHubAPIError
+import pytest
+
+import routers.discovery as discovery_router
+from services.github import GitHubService, GitHubRateLimitError, GitHubAPIError
+
+
+def _make_github_item(i):
+    """Build one mock GitHub search API item."""
+    return {
+        "id": 1000 + i,
+        "full_name": f"owner{i}/repo{i}",
+        "owner": {
+            "login": f"owner{i}",
+            "avatar_url": f"https://avatars.githubusercontent.com/u/{1000 + i}",
+        },
+        "name": f"repo{i}",
+        "description": f"Description for repo{i}",
+        "language": "Python",
+        "stargazers_count": 500 + i * 100,
+        "forks_count": 50 + i * 10,
+        "html_url": f"https://github.com/owner{i}/repo{i}",
+        "topics": ["testing"],
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+        "open_issues_count": 10 + i,
+        "license": {"spdx_id": "MIT", "name": "MIT License"},
+        "archived": False,
+    }
+
+
+# Items are constant per index, so build them once at import time
+_ITEMS = tuple(_make_github_item(i) for i in range(16))
 
 
 def _make_github_search_result(count=1, total_count=None):
     """Helper to create a mock GitHub search API response."""
-    items = []
-    for i in range(count):
-        items.append({
-            "id": 1000 + i,
-            "full_name": f"owner{i}/repo{i}",
-            "owner": {
-                "login": f"owner{i}",
-                "avatar_url": f"https://avatars.githubusercontent.com/u/{1000 + i}",
-            },
-            "name": f"repo{i}",
-            "description": f"Description for repo{i}",
-            "language": "Python",
-            "stargazers_count": 500 + i * 100,
-            "forks_count": 50 + i * 10,
-            "html_url": f"https://github.com/owner{i}/repo{i}",
-            "topics": ["testing"],
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2025-01-01T00:00:00Z",
-            "open_issues_count": 10 + i,
-            "license": {"spdx_id": "MIT", "name": "MIT License"},
-            "archived": False,
-        })
+    assert count <= len(_ITEMS), f"only {len(_ITEMS)} prebuilt items"
     return {
-        "items": items,
+        # Shallow item copies: tests only reassign top-level fields (license, archived)
+        "items": [dict(item) for item in _ITEMS[:count]],
         "total_count": total_count if total_count is not None else count,
     }
 
 
+# The router only reads the mocked payload, so tests that don't mutate it
+# share one pre-built instance instead of rebuilding it per test.
+_SINGLE_RESULT = _make_github_search_result(count=1, total_count=1)
+
+
 class TestDiscoverySearch:
     """Test cases for GET /api/discovery/search."""
 
+    @pytest.fixture(autouse=True)
+    def _patch_github_service(self, monkeypatch):
+        """Patch get_github_service once per test; tests configure self.mock_service."""
+        self.mock_service = AsyncMock(spec=GitHubService)
+        monkeypatch.setattr(
+            discovery_router, "get_github_service", lambda: self.mock_service
+        )
+
     def test_search_success(self, client):
         """Test successful search returns repos."""
         mock_result = _make_github_search_result(count=2, total_count=2)
+        self.mock_service.search_repos.return_value = mock_result
 
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
-
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get("/api/discovery/search?q=python")
+        response = client.get("/api/discovery/search?q=python")
 
         assert response.status_code == 200
         response_data = response.json()
@@ -74,27 +95,19 @@ class TestDiscoverySearch:
         assert repo["license_name"] == "MIT License"
         assert repo["archived"] is False
 
-    def test_search_missing_query_returns_422(self, client):
-        """Test that missing query parameter returns 422."""
-        response = client.get("/api/discovery/search")
-        assert response.status_code == 422
-
-    def test_search_empty_query_returns_422(self, client):
-        """Test that empty query parameter returns 422."""
-        response = client.get("/api/discovery/search?q=")
+    @pytest.mark.parametrize("query_string", ["", "?q="], ids=["missing", "empty"])
+    def test_search_invalid_query_returns_422(self, client, query_string):
+        """Test that a missing or empty query parameter returns 422."""
+        response = client.get(f"/api/discovery/search{query_string}")
         assert response.status_code == 422
 
     def test_search_with_filters(self, client):
         """Test search with language, min_stars, and topic filters."""
-        mock_result = _make_github_search_result(count=1, total_count=1)
+        self.mock_service.search_repos.return_value = _SINGLE_RESULT
 
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
-
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get(
-                "/api/discovery/search?q=web&language=Python&min_stars=100&topic=api"
-            )
+        response = client.get(
+            "/api/discovery/search?q=web&language=Python&min_stars=100&topic=api"
+        )
 
         assert response.status_code == 200
         response_data = response.json()
@@ -102,31 +115,21 @@ class TestDiscoverySearch:
         assert "data" in response_data
 
         # Verify filters were passed to the service
-        mock_service.search_repos.assert_called_once_with(
-            query="web",
-            language="Python",
-            min_stars=100,
-            max_stars=None,
-            topic="api",
-            sort="stars",
-            order="desc",
-            license=None,
-            hide_archived=False,
-            page=1,
-            per_page=20,
-        )
+        self.mock_service.search_repos.assert_called_once()
+        kwargs = self.mock_service.search_repos.call_args.kwargs
+        assert kwargs["query"] == "web"
+        assert kwargs["language"] == "Python"
+        assert kwargs["min_stars"] == 100
+        assert kwargs["topic"] == "api"
 
     def test_search_pagination(self, client):
         """Test search with pagination parameters."""
         mock_result = _make_github_search_result(count=5, total_count=100)
+        self.mock_service.search_repos.return_value = mock_result
 
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
-
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get(
-                "/api/discovery/search?q=test&page=3&per_page=5"
-            )
+        response = client.get(
+            "/api/discovery/search?q=test&page=3&per_page=5"
+        )
 
         assert response.status_code == 200
         response_data = response.json()
@@ -140,13 +143,11 @@ class TestDiscoverySearch:
 
     def test_search_rate_limit_returns_429(self, client):
         """Test that GitHub rate limit error returns 429."""
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(
-            side_effect=GitHubRateLimitError("Rate limit exceeded", status_code=429)
+        self.mock_service.search_repos.side_effect = GitHubRateLimitError(
+            "Rate limit exceeded", status_code=429
         )
 
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get("/api/discovery/search?q=python")
+        response = client.get("/api/discovery/search?q=python")
 
         assert response.status_code == 429
         data = response.json()
@@ -154,13 +155,11 @@ class TestDiscoverySearch:
 
     def test_search_api_error_returns_502(self, client):
         """Test that GitHub API error returns 502."""
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(
-            side_effect=GitHubAPIError("Internal server error", status_code=500)
+        self.mock_service.search_repos.side_effect = GitHubAPIError(
+            "Internal server error", status_code=500
         )
 
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get("/api/discovery/search?q=python")
+        response = client.get("/api/discovery/search?q=python")
 
         assert response.status_code == 502
         data = response.json()
@@ -168,34 +167,23 @@ class TestDiscoverySearch:
 
     def test_search_with_new_filters(self, client):
         """Test search with license, max_stars, order, and hide_archived filters."""
-        mock_result = _make_github_search_result(count=1, total_count=1)
-
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
+        self.mock_service.search_repos.return_value = _SINGLE_RESULT
 
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get(
-                "/api/discovery/search?q=web&license=mit&max_stars=5000"
-                "&order=asc&hide_archived=true"
-            )
+        response = client.get(
+            "/api/discovery/search?q=web&license=mit&max_stars=5000"
+            "&order=asc&hide_archived=true"
+        )
 
         assert response.status_code == 200
         response_data = response.json()
         assert response_data["success"] is True
 
-        mock_service.search_repos.assert_called_once_with(
-            query="web",
-            language=None,
-            min_stars=None,
-            max_stars=5000,
-            topic=None,
-            sort="stars",
-            order="asc",
-            license="mit",
-            hide_archived=True,
-            page=1,
-            per_page=20,
-        )
+        self.mock_service.search_repos.assert_called_once()
+        kwargs = self.mock_service.search_repos.call_args.kwargs
+        assert kwargs["license"] == "mit"
+        assert kwargs["max_stars"] == 5000
+        assert kwargs["order"] == "asc"
+        assert kwargs["hide_archived"] is True
 
     def test_search_repo_without_license(self, client):
         """Test that repos with no license have null license fields."""
@@ -203,11 +191,9 @@ class TestDiscoverySearch:
         # Set license to None for this item
         mock_result["items"][0]["license"] = None
 
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
+        self.mock_service.search_repos.return_value = mock_result
 
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get("/api/discovery/search?q=test")
+        response = client.get("/api/discovery/search?q=test")
 
         assert response.status_code == 200
         repo = response.json()["data"]["repos"][0]
@@ -219,11 +205,9 @@ class TestDiscoverySearch:
         mock_result = _make_github_search_result(count=1)
         mock_result["items"][0]["archived"] = True
 
-        mock_service = AsyncMock()
-        mock_service.search_repos = AsyncMock(return_value=mock_result)
+        self.mock_service.search_repos.return_value = mock_result
 
-        with patch("routers.discovery.get_github_service", return_value=mock_service):
-            response = client.get("/api/discovery/search?q=test")
+        response = client.get("/api/discovery/search?q=test")
 
         assert response.status_code == 200
         repo = response.json()["data"]["repos"][0]
@@ -5,16 +5,31 @@ Tests for export endpoints.
 
 import csv
 import io
-import json
 from datetime import timedelta
 
+import msgpack
+import orjson
 import pytest
+from sqlalchemy import event, insert
 
-from constants import SignalType
+from constants import GZIP_MINIMUM_SIZE_BYTES, SignalType
 from db.models import Repo, RepoSnapshot, Signal
+from routers.export import CSV_HEADER_LINE
 from utils.time import utc_now, utc_today
 
 
+def _json(response):
+    """Parse a response body with orjson (faster than response.json())."""
+    return orjson.loads(response.content)
+
+
+def _bulk_insert_repos(db, rows):
+    """Insert repos in one executemany and return their ids in input order."""
+    now = utc_now()
+    stmt = insert(Repo).returning(Repo.id, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, [{"added_at": now, "updated_at": now, **row} for row in rows]))
+
+
 class TestExportWatchlistJson:
     """Test cases for /api/export/watchlist.json endpoint."""
 
@@ -25,7 +40,7 @@ class TestExportWatchlistJson:
         assert response.headers["content-type"] == "application/json"
 
         # 解析 JSON 響應
-        data = response.json()
+        data = _json(response)
         assert "exported_at" in data
         assert "total" in data
         assert "repos" in data
@@ -39,7 +54,7 @@ class TestExportWatchlistJson:
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         assert data["total"] == 1
         assert len(data["repos"]) == 1
 
@@ -82,7 +97,7 @@ class TestExportWatchlistJson:
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         repo = data["repos"][0]
 
         # 驗證 snapshot 資料
@@ -123,7 +138,7 @@ class TestExportWatchlistJson:
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         repo = data["repos"][0]
 
         # 驗證所有訊號
@@ -170,7 +185,7 @@ class TestExportWatchlistJson:
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         repo = data["repos"][0]
 
         # 驗證完整資料
@@ -182,53 +197,59 @@ class TestExportWatchlistJson:
         assert repo["acceleration"] == 25.0
         assert repo["trend"] == 0.92
 
+    def test_export_watchlist_json_keeps_non_ascii(self, client, test_db, mock_repo):
+        """Test JSON export writes non-ASCII text as UTF-8 instead of escapes."""
+        mock_repo.description = "星星追蹤器"
+        test_db.commit()
+
+        response = client.get("/api/export/watchlist.json")
+        assert response.status_code == 200
+
+        assert "星星追蹤器".encode() in response.content
+        assert _json(response)["repos"][0]["description"] == "星星追蹤器"
+
     def test_export_watchlist_json_multiple_repos(self, client, test_db):
         """Test exporting multiple repos with batch query optimization."""
         from utils.time import utc_now
 
-        # 創建 3 個 repos
-        repos = []
-        for i in range(3):
-            repo = Repo(
-                owner=f"owner{i}",
-                name=f"repo{i}",
-                full_name=f"owner{i}/repo{i}",
-                url=f"https://github.com/owner{i}/repo{i}",
-                language="Python",
-                added_at=utc_now(),
-                updated_at=utc_now(),
-            )
-            test_db.add(repo)
-            test_db.flush()
-
-            # 為每個 repo 添加 snapshot
-            snapshot = RepoSnapshot(
-                repo_id=repo.id,
-                snapshot_date=utc_today(),
-                stars=1000 * (i + 1),
-                forks=100 * (i + 1),
-                watchers=50,
-                open_issues=10,
-                fetched_at=utc_now(),
-            )
-            test_db.add(snapshot)
-
-            # 為每個 repo 添加 signal
-            signal = Signal(
-                repo_id=repo.id,
-                signal_type=SignalType.VELOCITY,
-                value=50.0 * (i + 1),
-                calculated_at=utc_now(),
-            )
-            test_db.add(signal)
-            repos.append(repo)
-
+        # 創建 3 個 repos，各帶一筆 snapshot 與 signal（executemany 批次寫入）
+        repo_ids = _bulk_insert_repos(test_db, [
+            {
+                "owner": f"owner{i}",
+                "name": f"repo{i}",
+                "full_name": f"owner{i}/repo{i}",
+                "url": f"https://github.com/owner{i}/repo{i}",
+                "language": "Python",
+            }
+            for i in range(3)
+        ])
+        test_db.execute(insert(RepoSnapshot), [
+            {
+                "repo_id": repo_id,
+                "snapshot_date": utc_today(),
+                "stars": 1000 * (i + 1),
+                "forks": 100 * (i + 1),
+                "watchers": 50,
+                "open_issues": 10,
+                "fetched_at": utc_now(),
+            }
+            for i, repo_id in enumerate(repo_ids)
+        ])
+        test_db.execute(insert(Signal), [
+            {
+                "repo_id": repo_id,
+                "signal_type": SignalType.VELOCITY,
+                "value": 50.0 * (i + 1),
+                "calculated_at": utc_now(),
+            }
+            for i, repo_id in enumerate(repo_ids)
+        ])
         test_db.commit()
 
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         assert data["total"] == 3
         assert len(data["repos"]) == 3
 
@@ -251,6 +272,14 @@ class TestExportWatchlistJson:
         assert ".json" in content_disposition
         assert "attachment" in content_disposition
 
+    def test_export_watchlist_json_filename_matches_exported_at(self, client):
+        """Test the filename date and exported_at come from the same timestamp."""
+        response = client.get("/api/export/watchlist.json")
+
+        assert response.status_code == 200
+        exported_date = _json(response)["exported_at"][:10].replace("-", "")
+        assert f'filename="starscope_watchlist_{exported_date}.json"' in response.headers["content-disposition"]
+
     def test_export_watchlist_json_uses_latest_snapshot(
         self, client, test_db, mock_repo
     ):
@@ -283,7 +312,7 @@ class TestExportWatchlistJson:
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         repo = data["repos"][0]
 
         # 應該使用最新的 snapshot
@@ -291,6 +320,35 @@ class TestExportWatchlistJson:
         assert repo["forks"] == 5000
 
 
+class TestExportCompression:
+    """Test gzip compression of export responses."""
+
+    def test_large_export_is_gzipped(self, client, mock_multiple_repos):
+        """Test exports above the size threshold are gzip-encoded."""
+        response = client.get(
+            "/api/export/watchlist.json", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding") == "gzip"
+        # httpx 會自動解壓縮
+        assert _json(response)["total"] == 3
+
+    def test_small_export_is_not_gzipped(self, client):
+        """Test responses below the size threshold are sent uncompressed."""
+        response = client.get(
+            "/api/export/watchlist.json", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    def test_non_export_response_is_not_gzipped(self, client, mock_multiple_repos):
+        """Test compression is limited to the export routes."""
+        response = client.get("/api/repos", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert len(response.content) > GZIP_MINIMUM_SIZE_BYTES
+        assert "content-encoding" not in response.headers
+
+
 class TestExportWatchlistCsv:
     """Test cases for /api/export/watchlist.csv endpoint."""
 
@@ -335,6 +393,12 @@ class TestExportWatchlistCsv:
         ]
         assert reader.fieldnames == expected_columns
 
+        # 預先產生的 header 列應與 csv 模組輸出一致
+        header_buffer = io.StringIO()
+        csv.writer(header_buffer).writerow(expected_columns)
+        assert CSV_HEADER_LINE == header_buffer.getvalue()
+        assert content.startswith(CSV_HEADER_LINE)
+
     def test_export_watchlist_csv_with_data(self, client, test_db, mock_repo):
         """Test CSV export contains correct data."""
         # 創建完整資料
@@ -426,32 +490,30 @@ class TestExportWatchlistCsv:
         """Test CSV export with multiple repos."""
         from utils.time import utc_now
 
-        # 創建 2 個 repos
-        for i in range(2):
-            repo = Repo(
-                owner=f"user{i}",
-                name=f"project{i}",
-                full_name=f"user{i}/project{i}",
-                url=f"https://github.com/user{i}/project{i}",
-                language="Go",
-                description=f"Test project {i}",
-                added_at=utc_now(),
-                updated_at=utc_now(),
-            )
-            test_db.add(repo)
-            test_db.flush()
-
-            snapshot = RepoSnapshot(
-                repo_id=repo.id,
-                snapshot_date=utc_today(),
-                stars=5000 * (i + 1),
-                forks=1000 * (i + 1),
-                watchers=100,
-                open_issues=20,
-                fetched_at=utc_now(),
-            )
-            test_db.add(snapshot)
-
+        # 創建 2 個 repos，各帶一筆 snapshot（executemany 批次寫入）
+        repo_ids = _bulk_insert_repos(test_db, [
+            {
+                "owner": f"user{i}",
+                "name": f"project{i}",
+                "full_name": f"user{i}/project{i}",
+                "url": f"https://github.com/user{i}/project{i}",
+                "language": "Go",
+                "description": f"Test project {i}",
+            }
+            for i in range(2)
+        ])
+        test_db.execute(insert(RepoSnapshot), [
+            {
+                "repo_id": repo_id,
+                "snapshot_date": utc_today(),
+                "stars": 5000 * (i + 1),
+                "forks": 1000 * (i + 1),
+                "watchers": 100,
+                "open_issues": 20,
+                "fetched_at": utc_now(),
+            }
+            for i, repo_id in enumerate(repo_ids)
+        ])
         test_db.commit()
 
         response = client.get("/api/export/watchlist.csv")
@@ -469,6 +531,102 @@ class TestExportWatchlistCsv:
         assert by_owner["user1"]["stars"] == "10000"
 
 
+class TestExportWatchlistMsgpack:
+    """Test cases for /api/export/watchlist.msgpack endpoint."""
+
+    def test_export_watchlist_msgpack_empty(self, client):
+        """Test exporting empty watchlist as MessagePack."""
+        response = client.get("/api/export/watchlist.msgpack")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+
+        data = msgpack.unpackb(response.content)
+        assert "exported_at" in data
+        assert data["total"] == 0
+        assert data["repos"] == []
+
+    def test_export_watchlist_msgpack_matches_json(self, client, test_db, mock_repo):
+        """Test MessagePack export carries the same payload as the JSON export."""
+        test_db.add(RepoSnapshot(
+            repo_id=mock_repo.id,
+            snapshot_date=utc_today(),
+            stars=20000,
+            forks=8000,
+            watchers=1500,
+            open_issues=200,
+            fetched_at=utc_now(),
+        ))
+        test_db.add(Signal(
+            repo_id=mock_repo.id,
+            signal_type=SignalType.VELOCITY,
+            value=200.0,
+            calculated_at=utc_now(),
+        ))
+        test_db.commit()
+
+        packed = msgpack.unpackb(client.get("/api/export/watchlist.msgpack").content)
+        as_json = _json(client.get("/api/export/watchlist.json"))
+
+        assert packed["total"] == 1
+        assert packed["repos"] == as_json["repos"]
+        assert packed["repos"][0]["stars"] == 20000
+        assert packed["repos"][0]["velocity"] == 200.0
+
+    def test_export_watchlist_msgpack_filename_format(self, client):
+        """Test MessagePack export has correct filename format."""
+        response = client.get("/api/export/watchlist.msgpack")
+        assert response.status_code == 200
+
+        content_disposition = response.headers.get("content-disposition")
+        assert "attachment" in content_disposition
+        assert "starscope_watchlist_" in content_disposition
+        assert ".msgpack" in content_disposition
+
+
+class TestExportTrends:
+    """Test cases for /api/export/trends.{json,csv} endpoints."""
+
+    def test_export_trends_csv(self, client, test_db, mock_repo):
+        """Test trends CSV export ranks repos and fills signal columns."""
+        test_db.add(RepoSnapshot(
+            repo_id=mock_repo.id,
+            snapshot_date=utc_today(),
+            stars=3000,
+            forks=300,
+            watchers=30,
+            open_issues=3,
+            fetched_at=utc_now(),
+        ))
+        test_db.add(Signal(
+            repo_id=mock_repo.id,
+            signal_type=SignalType.VELOCITY,
+            value=42.0,
+            calculated_at=utc_now(),
+        ))
+        test_db.commit()
+
+        response = client.get("/api/export/trends.csv")
+        assert response.status_code == 200
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["rank"] == "1"
+        assert rows[0]["full_name"] == "testowner/testrepo"
+        assert rows[0]["stars"] == "3000"
+        assert rows[0]["velocity"] == "42.0"
+        assert rows[0]["acceleration"] == ""
+
+    def test_export_trends_json_empty(self, client):
+        """Test trends JSON export with no repos."""
+        response = client.get("/api/export/trends.json?sort_by=stars_delta_7d")
+        assert response.status_code == 200
+
+        data = _json(response)
+        assert data["sort_by"] == "stars_delta_7d"
+        assert data["total"] == 0
+        assert data["repos"] == []
+
+
 class TestExportBatchQueryOptimization:
     """Test batch query optimization to avoid N+1 queries."""
 
@@ -476,40 +634,36 @@ class TestExportBatchQueryOptimization:
         """Test snapshots are loaded in batch, not one-by-one."""
         from utils.time import utc_now
 
-        # 創建 5 個 repos
-        repo_ids = []
-        for i in range(5):
-            repo = Repo(
-                owner=f"org{i}",
-                name=f"lib{i}",
-                full_name=f"org{i}/lib{i}",
-                url=f"https://github.com/org{i}/lib{i}",
-                language="Rust",
-                added_at=utc_now(),
-                updated_at=utc_now(),
-            )
-            test_db.add(repo)
-            test_db.flush()
-
-            snapshot = RepoSnapshot(
-                repo_id=repo.id,
-                snapshot_date=utc_today(),
-                stars=100 * (i + 1),
-                forks=10 * (i + 1),
-                watchers=5,
-                open_issues=3,
-                fetched_at=utc_now(),
-            )
-            test_db.add(snapshot)
-            repo_ids.append(repo.id)
-
+        # 創建 5 個 repos 與各自的 snapshot（executemany 批次寫入）
+        repo_ids = _bulk_insert_repos(test_db, [
+            {
+                "owner": f"org{i}",
+                "name": f"lib{i}",
+                "full_name": f"org{i}/lib{i}",
+                "url": f"https://github.com/org{i}/lib{i}",
+                "language": "Rust",
+            }
+            for i in range(5)
+        ])
+        test_db.execute(insert(RepoSnapshot), [
+            {
+                "repo_id": repo_id,
+                "snapshot_date": utc_today(),
+                "stars": 100 * (i + 1),
+                "forks": 10 * (i + 1),
+                "watchers": 5,
+                "open_issues": 3,
+                "fetched_at": utc_now(),
+            }
+            for i, repo_id in enumerate(repo_ids)
+        ])
         test_db.commit()
 
         # 匯出應該使用批次查詢
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         assert data["total"] == 5
 
         # 驗證所有 repo 都有正確的 snapshot 資料（用 lookup 避免耦合排序）
@@ -521,41 +675,37 @@ class TestExportBatchQueryOptimization:
         """Test signals are loaded in batch, not one-by-one."""
         from utils.time import utc_now
 
-        # 創建 3 個 repos
-        for i in range(3):
-            repo = Repo(
-                owner=f"team{i}",
-                name=f"app{i}",
-                full_name=f"team{i}/app{i}",
-                url=f"https://github.com/team{i}/app{i}",
-                language="TypeScript",
-                added_at=utc_now(),
-                updated_at=utc_now(),
+        # 創建 3 個 repos，每個 repo 多個 signals（executemany 批次寫入）
+        repo_ids = _bulk_insert_repos(test_db, [
+            {
+                "owner": f"team{i}",
+                "name": f"app{i}",
+                "full_name": f"team{i}/app{i}",
+                "url": f"https://github.com/team{i}/app{i}",
+                "language": "TypeScript",
+            }
+            for i in range(3)
+        ])
+        test_db.execute(insert(Signal), [
+            {
+                "repo_id": repo_id,
+                "signal_type": signal_type,
+                "value": value * (i + 1),
+                "calculated_at": utc_now(),
+            }
+            for i, repo_id in enumerate(repo_ids)
+            for signal_type, value in (
+                (SignalType.VELOCITY, 30.0),
+                (SignalType.STARS_DELTA_7D, 200.0),
             )
-            test_db.add(repo)
-            test_db.flush()
-
-            # 每個 repo 添加多個 signals
-            signals_data = [
-                (SignalType.VELOCITY, 30.0 * (i + 1)),
-                (SignalType.STARS_DELTA_7D, 200.0 * (i + 1)),
-            ]
-            for signal_type, value in signals_data:
-                sig = Signal(
-                    repo_id=repo.id,
-                    signal_type=signal_type,
-                    value=value,
-                    calculated_at=utc_now(),
-                )
-                test_db.add(sig)
-
+        ])
         test_db.commit()
 
         # 匯出應該使用批次查詢
         response = client.get("/api/export/watchlist.json")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         assert data["total"] == 3
 
         # 驗證所有 repo 都有正確的 signal 資料（用 lookup 避免耦合排序）
@@ -563,3 +713,58 @@ class TestExportBatchQueryOptimization:
         for i in range(3):
             assert by_owner[f"team{i}"]["velocity"] == 30.0 * (i + 1)
             assert by_owner[f"team{i}"]["stars_delta_7d"] == 200.0 * (i + 1)
+
+    @pytest.mark.parametrize("repo_count", [1, 5])
+    def test_query_count_independent_of_repo_count(
+        self, client, test_db, test_engine, repo_count
+    ):
+        """Test export issues a constant number of queries (no N+1)."""
+        now = utc_now()
+        repo_ids = _bulk_insert_repos(test_db, [
+            {
+                "owner": f"n{i}",
+                "name": f"plus{i}",
+                "full_name": f"n{i}/plus{i}",
+                "url": f"https://github.com/n{i}/plus{i}",
+            }
+            for i in range(repo_count)
+        ])
+        test_db.execute(insert(RepoSnapshot), [
+            {
+                "repo_id": repo_id,
+                "snapshot_date": utc_today(),
+                "stars": 10,
+                "forks": 1,
+                "watchers": 1,
+                "open_issues": 0,
+                "fetched_at": now,
+            }
+            for repo_id in repo_ids
+        ])
+        test_db.execute(insert(Signal), [
+            {
+                "repo_id": repo_id,
+                "signal_type": SignalType.VELOCITY,
+                "value": 1.0,
+                "calculated_at": now,
+            }
+            for repo_id in repo_ids
+        ])
+        test_db.commit()
+
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", _count)
+        try:
+            response = client.get("/api/export/watchlist.json")
+        finally:
+            event.remove(test_engine, "before_cursor_execute", _count)
+
+        assert response.status_code == 200
+        assert _json(response)["total"] == repo_count
+        # repo、最新 snapshot 與 signals 皆在單一查詢中取得
+        assert len(statements) == 1
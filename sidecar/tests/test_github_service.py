@@ -2,13 +2,13 @@
 Tests for GitHub service.
 """
 
-import os
-from contextlib import contextmanager
+import asyncio
 
 import pytest
 import httpx
 from unittest.mock import patch, MagicMock, AsyncMock
 
+from constants import GITHUB_RATE_LIMIT_MAX_ATTEMPTS, GITHUB_RETRY_AFTER_MAX_SECONDS
 from services.github import (
     GitHubService,
     GitHubAPIError,
@@ -22,26 +22,44 @@ from services.github import (
 )
 
 
+# The only httpx.Response attributes the service touches; spec_set keeps the
+# mock from lazily growing child mocks for anything else.
+_RESPONSE_ATTRS = ["status_code", "headers", "json", "raise_for_status"]
+
+
 def _make_response(status_code: int = 200, json_data=None, headers=None):
     """Build a MagicMock that mimics an httpx.Response."""
-    resp = MagicMock()
+    resp = MagicMock(spec_set=_RESPONSE_ATTRS)
     resp.status_code = status_code
-    if json_data is not None:
-        resp.json.return_value = json_data
-    if headers is not None:
-        resp.headers = headers
+    resp.json.return_value = json_data
+    resp.headers = headers if headers is not None else {}
     return resp
 
 
-@contextmanager
-def _mock_http_client(response):
-    """Patch httpx.AsyncClient so that .get() returns *response*."""
-    with patch("httpx.AsyncClient") as mock_cls:
-        mock_client = AsyncMock()
-        mock_client.get.return_value = response
-        mock_client.is_closed = False
-        mock_cls.return_value = mock_client
-        yield mock_client
+def _mock_service(json_data, status_code: int = 200):
+    """
+    Build a GitHubService whose real AsyncClient is served by an httpx.MockTransport.
+
+    Returns the service and the list that records every request it sends.
+    """
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(status_code, json=json_data)
+
+    service = GitHubService(token="test-token", transport=httpx.MockTransport(_handler))
+    return service, requests
+
+
+@pytest.fixture(autouse=True)
+def _isolated_github_service(monkeypatch):
+    """Start and end every test with no cached service, DB token, or env token."""
+    monkeypatch.setattr("services.settings.get_setting", lambda key: None)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    reset_github_service()
+    yield
+    reset_github_service()
 
 
 class TestBuildGitHubHeaders:
@@ -72,67 +90,60 @@ class TestHandleGitHubResponse:
         result = handle_github_response(_make_response(200, {"stargazers_count": 1000}))
         assert result == {"stargazers_count": 1000}
 
-    def test_handles_404_with_raise(self):
-        """Test raises GitHubNotFoundError on 404."""
-        with pytest.raises(GitHubNotFoundError) as exc_info:
-            handle_github_response(_make_response(404), raise_on_error=True, context="owner/repo")
-
-        assert exc_info.value.status_code == 404
-        assert "owner/repo" in str(exc_info.value)
-
-    def test_handles_404_without_raise(self):
-        """Test returns None on 404 when raise_on_error=False."""
-        result = handle_github_response(_make_response(404), raise_on_error=False)
-        assert result is None
-
-    def test_handles_403_rate_limit(self):
-        """Test raises GitHubRateLimitError on 403."""
-        resp = _make_response(403, headers={"X-RateLimit-Remaining": "0"})
+    @pytest.mark.parametrize("status_code, headers, exc_type, message_fragment", [
+        (404, None, GitHubNotFoundError, "owner/repo"),
+        (403, {"X-RateLimit-Remaining": "0"}, GitHubRateLimitError, "rate limit"),
+        (401, None, GitHubAPIError, "authentication"),
+    ], ids=["not_found", "rate_limit", "unauthorized"])
+    def test_handles_error_with_raise(self, status_code, headers, exc_type, message_fragment):
+        """Test raises the matching error type when raise_on_error=True."""
+        resp = _make_response(status_code, headers=headers)
+        with pytest.raises(exc_type) as exc_info:
+            handle_github_response(resp, raise_on_error=True, context="owner/repo")
+
+        assert exc_info.value.status_code == status_code
+        assert message_fragment in str(exc_info.value).lower()
+
+    def test_secondary_rate_limit_carries_retry_after(self):
+        """Test the Retry-After header is exposed on GitHubRateLimitError."""
+        resp = _make_response(403, headers={"X-RateLimit-Remaining": "10", "Retry-After": "60"})
         with pytest.raises(GitHubRateLimitError) as exc_info:
             handle_github_response(resp, raise_on_error=True)
 
-        assert exc_info.value.status_code == 403
+        assert exc_info.value.retry_after == 60
 
-    def test_handles_403_without_raise(self):
-        """Test returns None on 403 when raise_on_error=False."""
-        resp = _make_response(403, headers={"X-RateLimit-Remaining": "0"})
+    @pytest.mark.parametrize("status_code, headers", [
+        (404, None),
+        (403, {"X-RateLimit-Remaining": "0"}),
+        (401, None),
+    ], ids=["not_found", "rate_limit", "unauthorized"])
+    def test_handles_error_without_raise(self, status_code, headers):
+        """Test returns None on error responses when raise_on_error=False."""
+        resp = _make_response(status_code, headers=headers)
         result = handle_github_response(resp, raise_on_error=False, context="test")
         assert result is None
 
-    def test_handles_401_unauthorized(self):
-        """Test raises GitHubAPIError on 401."""
-        with pytest.raises(GitHubAPIError) as exc_info:
-            handle_github_response(_make_response(401), raise_on_error=True)
-
-        assert exc_info.value.status_code == 401
-        assert "authentication" in str(exc_info.value).lower()
-
-    def test_handles_401_without_raise(self):
-        """Test returns None on 401 when raise_on_error=False."""
-        result = handle_github_response(_make_response(401), raise_on_error=False)
-        assert result is None
-
 
 class TestFetchRepoData:
     """Tests for fetch_repo_data function."""
 
-    @pytest.mark.asyncio
-    async def test_fetch_repo_data_success(self):
-        """Test successful repo data fetch."""
-        reset_github_service()
-
-        mock_response = {"stargazers_count": 1000, "forks_count": 100}
-
+    @pytest.fixture
+    def mock_get_repo(self):
+        """Patch GitHubService.get_repo once per test; tests set return_value/side_effect."""
         with patch.object(GitHubService, 'get_repo', new_callable=AsyncMock) as mock_get:
-            mock_get.return_value = mock_response
+            yield mock_get
 
-            result = await fetch_repo_data("owner", "repo")
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_fetch_repo_data_success(self, mock_get_repo):
+        """Test successful repo data fetch."""
+        mock_response = {"stargazers_count": 1000, "forks_count": 100}
+        mock_get_repo.return_value = mock_response
 
-            assert result == mock_response
+        result = await fetch_repo_data("owner", "repo")
 
-        reset_github_service()
+        assert result == mock_response
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     @pytest.mark.parametrize("exception", [
         GitHubNotFoundError("Not found", 404),
         GitHubRateLimitError("Rate limit", 403),
@@ -140,33 +151,156 @@ class TestFetchRepoData:
         httpx.TimeoutException("Timeout"),
         httpx.RequestError("Network error"),
     ], ids=["not_found", "rate_limit", "api_error", "timeout", "network_error"])
-    async def test_fetch_repo_data_returns_none_on_error(self, exception):
+    async def test_fetch_repo_data_returns_none_on_error(self, mock_get_repo, exception):
         """Test returns None when get_repo raises any handled exception."""
-        reset_github_service()
+        mock_get_repo.side_effect = exception
+        result = await fetch_repo_data("owner", "repo")
+        assert result is None
+        mock_get_repo.assert_awaited_once()
+
+    @pytest.fixture
+    def mock_sleep(self):
+        """Patch the backoff sleep so retry tests don't wait."""
+        with patch("services.github.asyncio.sleep", new_callable=AsyncMock) as sleep:
+            yield sleep
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_fetch_repo_data_retries_after_secondary_rate_limit(self, mock_get_repo, mock_sleep):
+        """Test a Retry-After rate limit is waited out and the fetch retried."""
+        mock_get_repo.side_effect = [
+            GitHubRateLimitError("Rate limit", 403, retry_after=5),
+            {"stargazers_count": 1000},
+        ]
 
-        with patch.object(GitHubService, 'get_repo', new_callable=AsyncMock) as mock_get:
-            mock_get.side_effect = exception
-            result = await fetch_repo_data("owner", "repo")
-            assert result is None
+        result = await fetch_repo_data("owner", "repo")
 
-        reset_github_service()
+        assert result == {"stargazers_count": 1000}
+        assert mock_get_repo.await_count == 2
+        mock_sleep.assert_awaited_once()
+        assert 5 <= mock_sleep.await_args.args[0] <= 6
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_fetch_repo_data_gives_up_after_max_attempts(self, mock_get_repo, mock_sleep):
+        """Test returns None once every attempt hits the secondary rate limit."""
+        mock_get_repo.side_effect = GitHubRateLimitError("Rate limit", 403, retry_after=1)
+
+        result = await fetch_repo_data("owner", "repo")
+
+        assert result is None
+        assert mock_get_repo.await_count == GITHUB_RATE_LIMIT_MAX_ATTEMPTS
+        assert mock_sleep.await_count == GITHUB_RATE_LIMIT_MAX_ATTEMPTS - 1
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_fetch_repo_data_skips_retry_when_retry_after_too_long(self, mock_get_repo, mock_sleep):
+        """Test a Retry-After beyond the cap is not waited on."""
+        mock_get_repo.side_effect = GitHubRateLimitError(
+            "Rate limit", 403, retry_after=GITHUB_RETRY_AFTER_MAX_SECONDS + 1
+        )
+
+        result = await fetch_repo_data("owner", "repo")
+
+        assert result is None
+        mock_get_repo.assert_awaited_once()
+        mock_sleep.assert_not_awaited()
 
 
 class TestGitHubServiceGetRepo:
     """Tests for GitHubService.get_repo method."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_get_repo_success(self):
         """Test successful repo fetch."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"stargazers_count": 1000})
 
-        with _mock_http_client(_make_response(200, {"stargazers_count": 1000})) as mock_client:
-            result = await service.get_repo("owner", "repo")
+        result = await service.get_repo("owner", "repo")
 
-            assert result == {"stargazers_count": 1000}
-            mock_client.get.assert_called_once()
+        assert result == {"stargazers_count": 1000}
+        assert len(requests) == 1
+        assert requests[0].url.path == "/repos/owner/repo"
+        assert requests[0].headers["Authorization"] == "Bearer test-token"
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_repo_returns_cached_on_304(self):
+        """Test a repeat fetch sends If-None-Match and reuses the cached body on 304."""
+        requests: list[httpx.Request] = []
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"stargazers_count": 1000}, headers={"ETag": '"v1"'})
+
+        service = GitHubService(token="test-token", transport=httpx.MockTransport(_handler))
+
+        first = await service.get_repo("owner", "repo")
+        second = await service.get_repo("owner", "repo")
+
+        assert first == second == {"stargazers_count": 1000}
+        assert "If-None-Match" not in requests[0].headers
+        assert requests[1].headers["If-None-Match"] == '"v1"'
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_repo_replaces_cached_body_on_new_etag(self):
+        """Test a 200 with a new ETag replaces the cached body."""
+        bodies = iter([
+            ({"stargazers_count": 1000}, '"v1"'),
+            ({"stargazers_count": 1001}, '"v2"'),
+        ])
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            body, etag = next(bodies)
+            return httpx.Response(200, json=body, headers={"ETag": etag})
+
+        service = GitHubService(token="test-token", transport=httpx.MockTransport(_handler))
+
+        await service.get_repo("owner", "repo")
+        result = await service.get_repo("owner", "repo")
+
+        assert result == {"stargazers_count": 1001}
+        assert service._etag_cache["https://api.github.com/repos/owner/repo"][0] == '"v2"'
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_repo_cached_body_survives_caller_mutation(self):
+        """Test mutating a returned payload does not change later 304 responses."""
+        def _handler(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json={"stargazers_count": 1000, "owner": {"login": "owner"}}, headers={"ETag": '"v1"'}
+            )
+
+        service = GitHubService(token="test-token", transport=httpx.MockTransport(_handler))
+
+        first = await service.get_repo("owner", "repo")
+        first["stargazers_count"] = 0
+        second = await service.get_repo("owner", "repo")
+        second["owner"]["login"] = "changed"
+        third = await service.get_repo("owner", "repo")
+
+        assert third == {"stargazers_count": 1000, "owner": {"login": "owner"}}
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_repo_cache_evicts_least_recently_used(self):
+        """Test the ETag cache stays bounded and drops the least recently used URL."""
+        def _handler(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("If-None-Match"):
+                return httpx.Response(304)
+            return httpx.Response(200, json={"path": request.url.path}, headers={"ETag": '"v1"'})
+
+        service = GitHubService(token="test-token", transport=httpx.MockTransport(_handler))
+
+        with patch("services.github.GITHUB_ETAG_CACHE_MAX_ENTRIES", 2):
+            await service.get_repo("owner", "a")
+            await service.get_repo("owner", "b")
+            await service.get_repo("owner", "a")  # 304 hit refreshes "a"
+            await service.get_repo("owner", "c")
+
+        assert list(service._etag_cache) == [
+            "https://api.github.com/repos/owner/a",
+            "https://api.github.com/repos/owner/c",
+        ]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_get_repo_stargazers_count(self):
         """Test get_repo_stargazers_count convenience method."""
         service = GitHubService()
@@ -182,213 +316,173 @@ class TestGitHubServiceGetRepo:
 class TestGitHubServiceTokenPriority:
     """Tests for GitHub service token priority."""
 
-    def test_uses_database_token_first(self):
+    def test_uses_database_token_first(self, monkeypatch):
         """Test prefers database token over environment."""
-        reset_github_service()
+        monkeypatch.setattr("services.settings.get_setting", lambda key: "db-token")
+        monkeypatch.setenv("GITHUB_TOKEN", "env-token")
 
-        with patch('services.settings.get_setting') as mock_get_setting:
-            mock_get_setting.return_value = "db-token"
+        assert get_github_service().token == "db-token"
 
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "env-token"}, clear=True):
-                service = get_github_service()
-                assert service.token == "db-token"
-
-        reset_github_service()
-
-    def test_falls_back_to_env_token(self):
+    def test_falls_back_to_env_token(self, monkeypatch):
         """Test falls back to environment when no database token."""
-        reset_github_service()
-
-        with patch('services.settings.get_setting') as mock_get_setting:
-            mock_get_setting.return_value = None
+        monkeypatch.setenv("GITHUB_TOKEN", "env-token")
 
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "env-token"}, clear=True):
-                service = get_github_service()
-                assert service.token == "env-token"
+        assert get_github_service().token == "env-token"
 
-        reset_github_service()
-
-    def test_handles_database_exception(self):
+    def test_handles_database_exception(self, monkeypatch):
         """Test handles exception when reading from database."""
-        reset_github_service()
+        def _raise(key):
+            raise Exception("DB Error")
 
-        with patch('services.settings.get_setting') as mock_get_setting:
-            mock_get_setting.side_effect = Exception("DB Error")
+        monkeypatch.setattr("services.settings.get_setting", _raise)
+        monkeypatch.setenv("GITHUB_TOKEN", "env-token")
 
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "env-token"}, clear=True):
-                service = get_github_service()
-                assert service.token == "env-token"
-
-        reset_github_service()
+        assert get_github_service().token == "env-token"
 
 
 class TestGitHubService:
     """Test cases for GitHub service."""
 
-    def test_get_github_service_reads_token_from_env(self):
+    def test_get_github_service_reads_token_from_env(self, monkeypatch):
         """Test that get_github_service reads token from environment."""
-        from services.github import get_github_service, reset_github_service
+        monkeypatch.setenv("GITHUB_TOKEN", "test-token-123")
 
-        # Reset to ensure clean state
-        reset_github_service()
-
-        with patch('services.settings.get_setting', return_value=None):
-            with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token-123"}, clear=True):
-                service = get_github_service()
-                assert service.token == "test-token-123"
-                assert "Authorization" in service.headers
-                assert service.headers["Authorization"] == "Bearer test-token-123"
-
-        # Clean up
-        reset_github_service()
+        service = get_github_service()
+        assert service.token == "test-token-123"
+        assert "Authorization" in service.headers
+        assert service.headers["Authorization"] == "Bearer test-token-123"
 
     def test_get_github_service_no_token(self):
         """Test that service works without token (with rate limits)."""
-        from services.github import get_github_service, reset_github_service
-
-        # Reset to ensure clean state
-        reset_github_service()
-
-        with patch('services.settings.get_setting', return_value=None):
-            with patch.dict(os.environ, {}, clear=True):
-                service = get_github_service()
-                assert service.token is None
-                assert "Authorization" not in service.headers
-
-        # Clean up
-        reset_github_service()
+        service = get_github_service()
+        assert service.token is None
+        assert "Authorization" not in service.headers
 
     def test_get_github_service_singleton(self):
         """Test that get_github_service returns same instance."""
-        from services.github import get_github_service, reset_github_service
-
-        # Reset to ensure clean state
-        reset_github_service()
-
         service1 = get_github_service()
         service2 = get_github_service()
         assert service1 is service2
 
-        # Clean up
-        reset_github_service()
-
     def test_reset_github_service(self):
         """Test that reset_github_service creates new instance."""
-        from services.github import get_github_service, reset_github_service
-
         service1 = get_github_service()
         reset_github_service()
         service2 = get_github_service()
 
         assert service1 is not service2
 
-        # Clean up
-        reset_github_service()
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_reset_leaves_previous_client_open(self):
+        """Test reset_github_service does not close a client an in-flight request may still hold."""
+        service = GitHubService()
+        client = service.client
+
+        with patch("services.github._default_service", service):
+            reset_github_service()
+            await asyncio.sleep(0)
+
+        assert not client.is_closed
+        await service.aclose()
 
     def test_github_service_headers(self):
         """Test that GitHub service has correct default headers."""
-        from services.github import GitHubService
-
         service = GitHubService()
         assert "Accept" in service.headers
         assert service.headers["Accept"] == "application/vnd.github+json"
         assert "X-GitHub-Api-Version" in service.headers
 
+    def test_github_service_headers_are_read_only_client_defaults(self):
+        """Test headers are frozen at construction and set on the shared client."""
+        service = GitHubService(token="test-token")
+        with pytest.raises(TypeError):
+            service.headers["Authorization"] = "Bearer other"  # type: ignore[index]
+
+        assert service.client.headers["Authorization"] == "Bearer test-token"
+        assert service.client.headers["Accept"] == "application/vnd.github+json"
+
 
 class TestGitHubServiceSearchRepos:
     """Tests for GitHubService.search_repos method."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_basic(self):
         """Test basic repo search."""
-        service = GitHubService(token="test-token")
         search_result = {"total_count": 1, "items": [{"full_name": "facebook/react"}]}
+        service, _ = _mock_service(search_result)
 
-        with _mock_http_client(_make_response(200, search_result)):
-            result = await service.search_repos("react")
+        result = await service.search_repos("react")
 
         assert result["total_count"] == 1
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_with_filters(self):
         """Test repo search with language and min_stars filters."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", language="Python", min_stars=100, topic="api")
+        await service.search_repos("web", language="Python", min_stars=100, topic="api")
 
-            # Verify query params include filters
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert "language:Python" in params["q"]
-            assert "stars:>=100" in params["q"]
-            assert "topic:api" in params["q"]
+        # Verify query params include filters
+        params = requests[0].url.params
+        assert "language:Python" in params["q"]
+        assert "stars:>=100" in params["q"]
+        assert "topic:api" in params["q"]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_star_range(self):
         """Test repo search with min_stars and max_stars produces range syntax."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", min_stars=100, max_stars=5000)
+        await service.search_repos("web", min_stars=100, max_stars=5000)
 
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert "stars:100..5000" in params["q"]
+        params = requests[0].url.params
+        assert "stars:100..5000" in params["q"]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_max_stars_only(self):
         """Test repo search with only max_stars."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", max_stars=1000)
+        await service.search_repos("web", max_stars=1000)
 
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert "stars:<=1000" in params["q"]
+        params = requests[0].url.params
+        assert "stars:<=1000" in params["q"]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_license_filter(self):
         """Test repo search with license qualifier."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", license="mit")
+        await service.search_repos("web", license="mit")
 
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert "license:mit" in params["q"]
+        params = requests[0].url.params
+        assert "license:mit" in params["q"]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_hide_archived(self):
         """Test repo search with hide_archived qualifier."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", hide_archived=True)
+        await service.search_repos("web", hide_archived=True)
 
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert "archived:false" in params["q"]
+        params = requests[0].url.params
+        assert "archived:false" in params["q"]
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_search_repos_order_param(self):
         """Test repo search passes order parameter."""
-        service = GitHubService(token="test-token")
+        service, requests = _mock_service({"total_count": 0, "items": []})
 
-        with _mock_http_client(_make_response(200, {"total_count": 0, "items": []})) as mock_client:
-            await service.search_repos("web", order="asc")
+        await service.search_repos("web", order="asc")
 
-            call_kwargs = mock_client.get.call_args
-            params = call_kwargs.kwargs.get("params", call_kwargs[1].get("params"))
-            assert params["order"] == "asc"
+        params = requests[0].url.params
+        assert params["order"] == "asc"
 
 
 class TestGitHubServiceStargazers:
     """Tests for GitHubService.get_stargazers_with_dates method."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_stargazers_exceeds_max_stars(self):
         """Test returns empty list when stars exceed max_stars."""
         service = GitHubService(token="test-token")
@@ -400,20 +494,21 @@ class TestGitHubServiceStargazers:
 
         assert result == []
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_stargazers_single_page(self):
         """Test fetching stargazers that fit in a single page."""
-        service = GitHubService(token="test-token")
         stargazer_data = [
             {"starred_at": "2024-01-15T10:00:00Z", "user": {"login": "user1"}},
             {"starred_at": "2024-01-16T11:00:00Z", "user": {"login": "user2"}},
         ]
+        service, requests = _mock_service(stargazer_data)
 
         with patch.object(service, 'get_repo', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = {"stargazers_count": 2}
 
-            with _mock_http_client(_make_response(200, stargazer_data)):
-                result = await service.get_stargazers_with_dates("owner", "repo", max_stars=5000, per_page=100)
+            result = await service.get_stargazers_with_dates("owner", "repo", max_stars=5000, per_page=100)
 
         assert len(result) == 2
         assert result[0]["user"]["login"] == "user1"
+        assert len(requests) == 1
+        assert requests[0].headers["Accept"] == "application/vnd.github.star+json"
@@ -1,7 +1,7 @@
 """Sidecar 啟停生命週期測試。"""
 
 import asyncio
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -90,3 +90,17 @@ class TestStartupResilience:
             await asyncio.sleep(0.01)  # 讓 task 執行並失敗
 
         # 如果到這裡沒拋出，表示 shutdown 正確消化了 task 的例外
+
+
+class TestSharedClientPatches:
+    """共用 TestClient 不應讓 scheduler 在測試期間維持被 mock 的狀態。"""
+
+    def test_scheduler_functions_are_real_while_client_is_active(self, client):
+        """測試期間 services.scheduler 與 main 引用的都是真正的函式。"""
+        import main
+        import services.scheduler as scheduler
+
+        for name in ("start_scheduler", "stop_scheduler", "trigger_fetch_now"):
+            assert not isinstance(getattr(scheduler, name), Mock)
+            assert getattr(main, name) is getattr(scheduler, name)
+        assert not isinstance(main.init_db, Mock)
@@ -4,6 +4,8 @@ Tests for repository endpoints.
 
 from unittest.mock import patch, AsyncMock
 
+import pytest
+
 
 MOCK_GITHUB_REPO_DATA = {
     "id": 10270250,
@@ -135,14 +137,16 @@ class TestReposEndpoints:
         assert data["success"] is True
         assert data["data"]["full_name"] == "testowner/testrepo"
 
-    def test_delete_repo_success(self, client, mock_repo):
+    def test_delete_repo_success(self, client, test_db, mock_repo):
         """Test deleting an existing repo."""
-        response = client.delete(f"/api/repos/{mock_repo.id}")
+        from db.models import Repo
+
+        repo_id = mock_repo.id
+        response = client.delete(f"/api/repos/{repo_id}")
         assert response.status_code == 204
 
-        # Verify repo is gone
-        response = client.get(f"/api/repos/{mock_repo.id}")
-        assert response.status_code == 404
+        # Verify repo is gone (a query, not the identity map, so it sees the delete)
+        assert test_db.query(Repo).filter(Repo.id == repo_id).count() == 0
 
     def test_delete_nonexistent_repo(self, client):
         """Test deleting a repo that doesn't exist."""
@@ -191,12 +195,8 @@ class TestReposEndpoints:
         """Test batch refresh with some repos failing (GitHubNotFoundError)."""
         from services.github import GitHubNotFoundError
 
-        call_count = 0
-
         async def mock_fetch(github, owner, name):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 2:
+            if name == "vue":
                 raise GitHubNotFoundError(f"{owner}/{name}")
             return {
                 **MOCK_GITHUB_REPO_DATA,
@@ -212,7 +212,7 @@ class TestReposEndpoints:
 
         assert response.status_code == 200
         data = response.json()
-        assert "1 failed" in data["message"]
+        assert data["message"] == "Refreshed 2 repositories, 1 failed"
 
     def test_fetch_all_repos_api_error(self, client, mock_repo):
         """Test batch refresh with GitHubAPIError."""
@@ -229,38 +229,42 @@ class TestReposEndpoints:
         data = response.json()
         assert "1 failed" in data["message"]
 
+    def test_fetch_all_repos_unexpected_error_continues(self, client, mock_multiple_repos):
+        """Test an unexpected error on one repo is counted as failed without aborting the batch."""
+        async def mock_fetch(github, owner, name):
+            if name == "vue":
+                raise RuntimeError("boom")
+            return {
+                **MOCK_GITHUB_REPO_DATA,
+                "full_name": f"{owner}/{name}",
+                "name": name,
+            }
 
-class TestInputValidation:
-    """Test input validation for repository endpoints."""
+        with patch("routers.repos.get_github_service") as mock_gh, \
+             patch("routers.repos.fetch_repo_with_retry", side_effect=mock_fetch):
+            mock_gh.return_value = AsyncMock()
 
-    def test_owner_name_too_long(self, client):
-        """Test that overly long owner names are rejected."""
-        response = client.post("/api/repos", json={
-            "owner": "a" * 100,
-            "name": "test"
-        })
-        assert response.status_code == 422  # Pydantic validation error
+            response = client.post("/api/repos/fetch-all")
 
-    def test_repo_name_too_long(self, client):
-        """Test that overly long repo names are rejected."""
-        response = client.post("/api/repos", json={
-            "owner": "test",
-            "name": "a" * 200
-        })
-        assert response.status_code == 422  # Pydantic validation error
+        assert response.status_code == 200
+        data = response.json()
+        assert data["message"] == "Refreshed 2 repositories, 1 failed"
 
-    def test_invalid_owner_format(self, client):
-        """Test that invalid owner format is rejected."""
-        response = client.post("/api/repos", json={
-            "owner": "invalid--owner",  # consecutive hyphens are invalid
-            "name": "test"
-        })
-        assert response.status_code == 422  # Pydantic validation error
 
-    def test_invalid_repo_name_format(self, client):
-        """Test that invalid repo name format is rejected."""
-        response = client.post("/api/repos", json={
-            "owner": "valid",
-            "name": "invalid repo name with spaces"
-        })
+class TestInputValidation:
+    """Test input validation for repository endpoints."""
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"owner": "a" * 100, "name": "test"},
+            {"owner": "test", "name": "a" * 200},
+            {"owner": "invalid--owner", "name": "test"},  # consecutive hyphens are invalid
+            {"owner": "valid", "name": "invalid repo name with spaces"},
+        ],
+        ids=["owner_too_long", "name_too_long", "invalid_owner_format", "invalid_name_format"],
+    )
+    def test_invalid_repo_input_rejected(self, client, payload):
+        """Test that overly long or malformed owner/repo names are rejected."""
+        response = client.post("/api/repos", json=payload)
         assert response.status_code == 422  # Pydantic validation error
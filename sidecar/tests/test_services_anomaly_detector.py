@@ -34,10 +34,6 @@ class TestDetectRisingStar:
 
     def test_returns_none_when_no_snapshot(self, test_db, mock_repo):
         """Test returns None when no snapshot exists."""
-        # Remove any existing snapshots
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-        test_db.commit()
-
         result = AnomalyDetector.detect_rising_star(mock_repo, test_db)
         assert result is None
 
@@ -50,7 +46,7 @@ class TestDetectRisingStar:
             stars=10000,  # Above RISING_STAR_MAX_STARS
         )
         test_db.add(snapshot)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_rising_star(mock_repo, test_db)
         assert result is None
@@ -63,24 +59,19 @@ class TestDetectRisingStar:
             stars=1000,
         )
         test_db.add(snapshot)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_rising_star(mock_repo, test_db)
         assert result is None
 
     def test_detects_rising_star_by_velocity(self, test_db, mock_repo):
         """Test detects rising star with high velocity."""
-        # Remove existing snapshots
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-
         # Create snapshot
         snapshot = RepoSnapshot(
             repo_id=mock_repo.id,
             snapshot_date=utc_today(),
             stars=2000,
         )
-        test_db.add(snapshot)
 
         # Create velocity signal above threshold
         signal = Signal(
@@ -89,8 +80,8 @@ class TestDetectRisingStar:
             value=15.0,  # Above RISING_STAR_MIN_VELOCITY
             calculated_at=utc_now(),
         )
-        test_db.add(signal)
-        test_db.commit()
+        test_db.add_all([snapshot, signal])
+        test_db.flush()
 
         result = AnomalyDetector.detect_rising_star(mock_repo, test_db)
 
@@ -100,20 +91,15 @@ class TestDetectRisingStar:
 
     def test_high_severity_for_high_velocity(self, test_db, mock_repo):
         """Test assigns HIGH severity for very high velocity."""
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-
         snapshot = RepoSnapshot(repo_id=mock_repo.id, snapshot_date=utc_today(), stars=1000)
-        test_db.add(snapshot)
-
         signal = Signal(
             repo_id=mock_repo.id,
             signal_type=SignalType.VELOCITY,
             value=60.0,  # Very high
             calculated_at=utc_now(),
         )
-        test_db.add(signal)
-        test_db.commit()
+        test_db.add_all([snapshot, signal])
+        test_db.flush()
 
         result = AnomalyDetector.detect_rising_star(mock_repo, test_db)
 
@@ -126,19 +112,15 @@ class TestDetectSuddenSpike:
 
     def test_returns_none_with_insufficient_snapshots(self, test_db, mock_repo):
         """Test returns None with less than 2 snapshots."""
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-
         snapshot = RepoSnapshot(repo_id=mock_repo.id, snapshot_date=utc_today(), stars=1000)
         test_db.add(snapshot)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_sudden_spike(mock_repo, test_db)
         assert result is None
 
     def test_detects_spike(self, test_db, mock_repo):
         """Test detects sudden spike pattern."""
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-
         # Create snapshots showing spike
         today = utc_today()
         snapshots = [
@@ -148,7 +130,7 @@ class TestDetectSuddenSpike:
             RepoSnapshot(repo_id=mock_repo.id, snapshot_date=today - timedelta(days=3), stars=1400),
         ]
         test_db.add_all(snapshots)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_sudden_spike(mock_repo, test_db)
 
@@ -157,8 +139,6 @@ class TestDetectSuddenSpike:
 
     def test_returns_none_without_spike(self, test_db, mock_repo):
         """Test returns None without spike pattern."""
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-
         # Create snapshots with steady growth
         today = utc_today()
         snapshots = [
@@ -167,7 +147,7 @@ class TestDetectSuddenSpike:
             RepoSnapshot(repo_id=mock_repo.id, snapshot_date=today - timedelta(days=2), stars=950),
         ]
         test_db.add_all(snapshots)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_sudden_spike(mock_repo, test_db)
         assert result is None
@@ -178,16 +158,11 @@ class TestDetectBreakout:
 
     def test_returns_none_without_signals(self, test_db, mock_repo):
         """Test returns None when no delta signals exist."""
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-        test_db.commit()
-
         result = AnomalyDetector.detect_breakout(mock_repo, test_db)
         assert result is None
 
     def test_detects_breakout(self, test_db, mock_repo):
         """Test detects breakout pattern."""
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-
         # Create signals showing breakout
         signals = [
             Signal(
@@ -204,7 +179,7 @@ class TestDetectBreakout:
             ),
         ]
         test_db.add_all(signals)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_breakout(mock_repo, test_db)
 
@@ -233,7 +208,7 @@ class TestDetectViralHN:
             fetched_at=utc_now(),
         )
         test_db.add(hn_signal)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_viral_hn(mock_repo, test_db)
 
@@ -254,7 +229,7 @@ class TestDetectViralHN:
             fetched_at=old_time,
         )
         test_db.add(hn_signal)
-        test_db.commit()
+        test_db.flush()
 
         result = AnomalyDetector.detect_viral_hn(mock_repo, test_db)
         assert result is None
@@ -265,41 +240,33 @@ class TestDetectAllForRepo:
 
     def test_returns_empty_list_when_no_signals(self, test_db, mock_repo):
         """Test returns empty list when no anomalies detected."""
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-        test_db.commit()
-
         result = AnomalyDetector.detect_all_for_repo(mock_repo, test_db)
         assert result == []
 
     def test_skips_duplicate_signals(self, test_db, mock_repo):
         """Test skips signals that already exist and haven't expired."""
         # Create existing signal
+        now = utc_now()
         existing = EarlySignal(
             repo_id=mock_repo.id,
             signal_type=EarlySignalType.RISING_STAR,
             severity=EarlySignalSeverity.LOW,
             description="Existing",
-            detected_at=utc_now(),
-            expires_at=utc_now() + timedelta(days=7),
+            detected_at=now,
+            expires_at=now + timedelta(days=7),
             acknowledged=False,
         )
-        test_db.add(existing)
-        test_db.commit()
 
         # Setup conditions for rising star detection
-        test_db.query(RepoSnapshot).filter(RepoSnapshot.repo_id == mock_repo.id).delete()
-        test_db.query(Signal).filter(Signal.repo_id == mock_repo.id).delete()
-
         snapshot = RepoSnapshot(repo_id=mock_repo.id, snapshot_date=utc_today(), stars=1000)
         signal = Signal(
             repo_id=mock_repo.id,
             signal_type=SignalType.VELOCITY,
             value=20.0,
-            calculated_at=utc_now(),
+            calculated_at=now,
         )
-        test_db.add_all([snapshot, signal])
-        test_db.commit()
+        test_db.add_all([existing, snapshot, signal])
+        test_db.flush()
 
         result = AnomalyDetector.detect_all_for_repo(mock_repo, test_db)
 
@@ -332,12 +299,9 @@ class TestGetAnomalyDetector:
     """Tests for get_anomaly_detector function."""
 
     @pytest.fixture(autouse=True)
-    def reset_singleton(self):
+    def reset_singleton(self, monkeypatch):
         import services.anomaly_detector as detector_module
-        original = detector_module._detector
-        detector_module._detector = None
-        yield
-        detector_module._detector = original
+        monkeypatch.setattr(detector_module, "_detector", None)
 
     def test_returns_singleton(self):
         """Test returns the same instance."""
@@ -355,12 +355,9 @@ class TestGetGitHubAuthService:
     """Tests for get_github_auth_service function."""
 
     @pytest.fixture(autouse=True)
-    def reset_singleton(self):
+    def reset_singleton(self, monkeypatch):
         import services.github_auth as auth_module
-        original = auth_module._auth_service
-        auth_module._auth_service = None
-        yield
-        auth_module._auth_service = original
+        monkeypatch.setattr(auth_module, "_auth_service", None)
 
     def test_returns_singleton(self):
         """Test returns the same instance."""
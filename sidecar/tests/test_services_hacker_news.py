@@ -19,6 +19,11 @@ from services.hacker_news import (
 from services import hacker_news as hn_module
 
 
+def _mock_transport(payload: dict) -> httpx.MockTransport:
+    """Serve *payload* as the JSON body of every HN search request."""
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=payload))
+
+
 class TestParseCreatedAt:
     """Tests for _parse_created_at function."""
 
@@ -180,93 +185,67 @@ class TestHackerNewsService:
     @pytest.mark.asyncio
     async def test_search_repo_success(self):
         """Test successful repo search with relevant title."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        payload = {
             "hits": [{"objectID": "1", "title": "Introducing repo: a new tool", "points": 100}]
         }
+        service = HackerNewsService(transport=_mock_transport(payload))
 
-        with patch('httpx.AsyncClient') as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
-            mock_client_class.return_value.__aenter__.return_value = mock_client
-
-            service = HackerNewsService()
-            result = await service.search_repo("repo", "owner")
+        result = await service.search_repo("repo", "owner")
 
-            assert len(result) == 1
-            assert isinstance(result[0], HNStory)
+        assert len(result) == 1
+        assert isinstance(result[0], HNStory)
 
     @pytest.mark.asyncio
     async def test_search_repo_filters_irrelevant(self):
         """Test irrelevant results are filtered out by relevance check."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        payload = {
             "hits": [
                 {"objectID": "1", "title": "About myrepo project", "points": 100},
                 {"objectID": "2", "title": "Unrelated article about cats", "points": 50},
             ]
         }
+        service = HackerNewsService(transport=_mock_transport(payload))
 
-        with patch('httpx.AsyncClient') as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+        result = await service.search_repo("myrepo", "owner")
 
-            service = HackerNewsService()
-            result = await service.search_repo("myrepo", "owner")
-
-            assert len(result) == 1
-            assert result[0].title == "About myrepo project"
+        assert len(result) == 1
+        assert result[0].title == "About myrepo project"
 
     @pytest.mark.asyncio
     async def test_search_repo_sorts_by_points(self):
         """Test results are sorted by points descending."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        payload = {
             "hits": [
                 {"objectID": "1", "title": "Low score repo mention", "points": 10},
                 {"objectID": "2", "title": "High score repo mention", "points": 100},
                 {"objectID": "3", "title": "Medium score repo mention", "points": 50},
             ]
         }
+        service = HackerNewsService(transport=_mock_transport(payload))
 
-        with patch('httpx.AsyncClient') as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
-            mock_client_class.return_value.__aenter__.return_value = mock_client
-
-            service = HackerNewsService()
-            result = await service.search_repo("repo", "owner")
+        result = await service.search_repo("repo", "owner")
 
-            # Should be sorted by points descending
-            assert result[0].points >= result[1].points >= result[2].points
+        # Should be sorted by points descending
+        assert result[0].points >= result[1].points >= result[2].points
 
     @pytest.mark.asyncio
     async def test_search_repo_raises_on_all_failures(self):
         """Test raises error when all queries fail."""
-        with patch('httpx.AsyncClient') as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.get.side_effect = httpx.TimeoutException("Timeout")
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+        def _timeout(request: httpx.Request) -> httpx.Response:
+            raise httpx.TimeoutException("Timeout", request=request)
 
-            service = HackerNewsService()
+        service = HackerNewsService(transport=httpx.MockTransport(_timeout))
 
-            with pytest.raises(HackerNewsAPIError):
-                await service.search_repo("repo", "owner")
+        with pytest.raises(HackerNewsAPIError):
+            await service.search_repo("repo", "owner")
 
 
 class TestGetHnService:
     """Tests for get_hn_service function."""
 
     @pytest.fixture(autouse=True)
-    def reset_singleton(self):
-        original = hn_module._default_service
-        hn_module._default_service = None
-        yield
-        hn_module._default_service = original
+    def reset_singleton(self, monkeypatch):
+        monkeypatch.setattr(hn_module, "_default_service", None)
 
     def test_returns_singleton(self):
         """Test returns the same instance."""
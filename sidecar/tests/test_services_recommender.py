@@ -13,7 +13,6 @@ from utils.time import utc_today
 from services.recommender import (
     RecommenderService,
     get_recommender_service,
-    find_similar_repos,
     calculate_repo_similarities,
     recalculate_all_similarities,
     MIN_SIMILARITY_THRESHOLD,
@@ -293,11 +292,8 @@ class TestGetRecommenderService:
     """Tests for get_recommender_service function."""
 
     @pytest.fixture(autouse=True)
-    def reset_singleton(self):
-        original = recommender_module._recommender
-        recommender_module._recommender = None
-        yield
-        recommender_module._recommender = original
+    def reset_singleton(self, monkeypatch):
+        monkeypatch.setattr(recommender_module, "_recommender", None)
 
     def test_returns_singleton(self):
         """Test returns the same instance."""
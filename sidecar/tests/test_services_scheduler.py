@@ -12,7 +12,7 @@ def _mock_db_ctx(db):
     """Create a context manager factory that yields the given db session.
 
     Returns the factory (not an instance) so each call produces a fresh,
-    reusable context manager.  Use with ``patch(..., new=_mock_db_ctx(db))``.
+    reusable context manager.
     """
     @contextmanager
     def _ctx():
@@ -32,36 +32,42 @@ from services.scheduler import (
     _track_repo_failure,
     FAILURE_ALERT_THRESHOLD,
 )
+import services.scheduler as scheduler_module
+
+
+@pytest.fixture
+def scheduler_db(test_db, monkeypatch):
+    """Point the scheduler's get_db_session at this test's session."""
+    monkeypatch.setattr(scheduler_module, "get_db_session", _mock_db_ctx(test_db))
+    return test_db
 
 
 class TestGetScheduler:
     """Tests for get_scheduler function."""
 
-    def test_returns_singleton(self):
+    def test_returns_singleton(self, monkeypatch):
         """Test that scheduler is a singleton."""
-        import services.scheduler as scheduler_module
-        scheduler_module._scheduler = None
+        monkeypatch.setattr(scheduler_module, "_scheduler", None)
 
         s1 = get_scheduler()
         s2 = get_scheduler()
         assert s1 is s2
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestFetchAllReposJob:
     """Tests for fetch_all_repos_job function."""
 
     @pytest.mark.asyncio
-    async def test_empty_watchlist(self, test_db):
+    async def test_empty_watchlist(self):
         """Test with empty watchlist."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)):
-            # Should complete without error
-            await fetch_all_repos_job()
+        # Should complete without error
+        await fetch_all_repos_job()
 
     @pytest.mark.asyncio
     async def test_fetches_repos(self, test_db, mock_repo):
         """Test fetches repos from watchlist."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch, \
+        with patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch, \
              patch('services.scheduler.update_repo_from_github') as mock_update:
 
             mock_fetch.return_value = {
@@ -84,10 +90,9 @@ class TestFetchAllReposJob:
             assert call_args[0][2] is test_db
 
     @pytest.mark.asyncio
-    async def test_handles_fetch_error(self, test_db, mock_repo):
+    async def test_handles_fetch_error(self, mock_repo):
         """Test handles errors during fetch."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.return_value = None  # Simulate fetch failure
 
@@ -95,10 +100,9 @@ class TestFetchAllReposJob:
             await fetch_all_repos_job()
 
     @pytest.mark.asyncio
-    async def test_handles_github_exception(self, test_db, mock_repo):
+    async def test_handles_github_exception(self, mock_repo):
         """Test handles GitHub API exceptions gracefully (per-repo)."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.side_effect = GitHubAPIError("API Error")
 
@@ -106,10 +110,9 @@ class TestFetchAllReposJob:
             await fetch_all_repos_job()
 
     @pytest.mark.asyncio
-    async def test_handles_unexpected_exception(self, test_db, mock_repo):
+    async def test_handles_unexpected_exception(self, mock_repo):
         """Test handles unexpected exceptions gracefully (per-repo)."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_repo_data', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.side_effect = ValueError("Unexpected error")
 
@@ -117,13 +120,13 @@ class TestFetchAllReposJob:
             await fetch_all_repos_job()
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestCheckAlertsJob:
     """Tests for check_alerts_job function."""
 
     def test_checks_alerts(self, test_db):
         """Test calls check_all_alerts with a valid DB session."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.alerts.check_all_alerts') as mock_check:
+        with patch('services.alerts.check_all_alerts') as mock_check:
 
             mock_check.return_value = []
             check_alerts_job()
@@ -135,8 +138,7 @@ class TestCheckAlertsJob:
 
     def test_handles_triggered_alerts(self, test_db):
         """Test processes non-empty triggered alerts without raising."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.alerts.check_all_alerts') as mock_check:
+        with patch('services.alerts.check_all_alerts') as mock_check:
 
             mock_check.return_value = [MagicMock(), MagicMock()]
             # Should complete without raising even with triggered alerts
@@ -147,23 +149,22 @@ class TestCheckAlertsJob:
             call_args = mock_check.call_args
             assert call_args[0][0] is test_db
 
-    def test_handles_exception(self, test_db):
+    def test_handles_exception(self):
         """Test handles exception gracefully."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.alerts.check_all_alerts') as mock_check:
+        with patch('services.alerts.check_all_alerts') as mock_check:
 
             mock_check.side_effect = Exception("DB Error")
             check_alerts_job()  # Should not raise
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestFetchContextSignalsJob:
     """Tests for fetch_context_signals_job function."""
 
     @pytest.mark.asyncio
-    async def test_fetches_context_signals(self, test_db):
+    async def test_fetches_context_signals(self):
         """Test fetches context signals."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.return_value = {
                 "new_hn_signals": 5,
@@ -175,10 +176,9 @@ class TestFetchContextSignalsJob:
             mock_fetch.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_handles_exception(self, test_db):
+    async def test_handles_exception(self):
         """Test handles exception gracefully."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.side_effect = Exception("Network Error")
 
@@ -262,14 +262,14 @@ class TestTrackRepoFailure:
             assert "x" * 201 not in logged_msg
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestCleanupOldSnapshots:
     """Tests for cleanup_old_snapshots function."""
 
-    def test_cleanup_no_old_snapshots(self, test_db):
+    def test_cleanup_no_old_snapshots(self):
         """Test cleanup when no snapshots exceed retention period."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)):
-            deleted = cleanup_old_snapshots(retention_days=90)
-            assert deleted == 0
+        deleted = cleanup_old_snapshots(retention_days=90)
+        assert deleted == 0
 
     def test_cleanup_with_old_snapshots(self, test_db, mock_repo):
         """Test cleanup removes old snapshots but keeps latest per repo."""
@@ -303,9 +303,8 @@ class TestCleanupOldSnapshots:
         test_db.add(recent_snapshot)
         test_db.commit()
 
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)):
-            deleted = cleanup_old_snapshots(retention_days=90)
-            assert deleted == 1
+        deleted = cleanup_old_snapshots(retention_days=90)
+        assert deleted == 1
 
         # Verify the recent snapshot survived, not the old one
         remaining = test_db.query(RepoSnapshot).filter(
@@ -318,8 +317,7 @@ class TestCleanupOldSnapshots:
         """Test cleanup handles DB error gracefully."""
         from sqlalchemy.exc import SQLAlchemyError
 
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch.object(test_db, 'query', side_effect=SQLAlchemyError("DB error")):
+        with patch.object(test_db, 'query', side_effect=SQLAlchemyError("DB error")):
             deleted = cleanup_old_snapshots()
             assert deleted == 0
 
@@ -368,36 +366,35 @@ class TestBackupJob:
             backup_job()  # Should not raise
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestCheckAlertsJobImportError:
     """Tests for check_alerts_job edge cases."""
 
-    def test_handles_import_error(self, test_db):
+    def test_handles_import_error(self):
         """Test handles ImportError when alerts service unavailable."""
         # check_alerts_job uses lazy import (from services.alerts import check_all_alerts),
         # so patching sys.modules with None correctly triggers ImportError
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch.dict('sys.modules', {'services.alerts': None}):
+        with patch.dict('sys.modules', {'services.alerts': None}):
             check_alerts_job()  # Should not raise
 
-    def test_handles_sqlalchemy_error(self, test_db):
+    def test_handles_sqlalchemy_error(self):
         """Test handles SQLAlchemyError during alert check."""
         from sqlalchemy.exc import SQLAlchemyError
 
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.alerts.check_all_alerts') as mock_check:
+        with patch('services.alerts.check_all_alerts') as mock_check:
             mock_check.side_effect = SQLAlchemyError("Connection lost")
 
             check_alerts_job()  # Should not raise
 
 
+@pytest.mark.usefixtures("scheduler_db")
 class TestFetchContextSignalsJobCleanup:
     """Tests for fetch_context_signals_job cleanup path."""
 
     @pytest.mark.asyncio
-    async def test_runs_cleanup_after_fetch(self, test_db):
+    async def test_runs_cleanup_after_fetch(self):
         """Test runs cleanup_old_context_signals after successful fetch."""
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch, \
+        with patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch, \
              patch('services.context_fetcher.cleanup_old_context_signals') as mock_cleanup:
 
             mock_fetch.return_value = {"new_hn_signals": 3, "errors": 0}
@@ -408,12 +405,11 @@ class TestFetchContextSignalsJobCleanup:
             mock_cleanup.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_handles_sqlalchemy_error(self, test_db):
+    async def test_handles_sqlalchemy_error(self):
         """Test handles SQLAlchemyError during context signal fetch."""
         from sqlalchemy.exc import SQLAlchemyError
 
-        with patch('services.scheduler.get_db_session', new=_mock_db_ctx(test_db)), \
-             patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
+        with patch('services.scheduler.fetch_all_context_signals', new_callable=AsyncMock) as mock_fetch:
 
             mock_fetch.side_effect = SQLAlchemyError("DB error")
 
@@ -1,13 +1,10 @@
 """Tests for services/snapshot.py — create_or_update_snapshot & update_repo_from_github."""
 
-from datetime import timedelta
 from unittest.mock import patch
 
-import pytest
-
 from db.models import Repo, RepoSnapshot
 from services.snapshot import create_or_update_snapshot, update_repo_from_github
-from utils.time import utc_now, utc_today
+from utils.time import utc_today
 
 
 # ── Fixtures ──────────────────────────────────────────────
@@ -125,5 +122,5 @@ class TestUpdateRepoFromGithub:
         update_repo_from_github(mock_repo, SAMPLE_GITHUB_DATA, test_db)
 
         # 驗證資料已持久化（不需手動 commit）
-        refreshed = test_db.query(Repo).filter(Repo.id == mock_repo.id).first()
+        refreshed = test_db.get(Repo, mock_repo.id)
         assert refreshed.description == "Updated description"
@@ -3,6 +3,7 @@ Tests for star history endpoints.
 """
 
 from datetime import timedelta
+from itertools import pairwise
 from unittest.mock import patch, AsyncMock
 
 from db.models import RepoSnapshot
@@ -158,7 +159,7 @@ class TestStarHistoryGet:
         assert len(data["history"]) == len(snapshots)
         # Verify sorting by date ascending
         dates = [point["date"] for point in data["history"]]
-        assert dates == sorted(dates)
+        assert all(earlier <= later for earlier, later in pairwise(dates))
 
     def test_get_history_empty(self, client, mock_repo):
         """Test getting star history for a repo with no snapshots."""
@@ -65,18 +65,23 @@ class TestTrendsEndpoints:
         from constants import SignalType
 
         # Create 3 repos with velocity signals
-        for i in range(3):
-            repo = Repo(
+        repos = [
+            Repo(
                 owner=f"org{i}", name=f"lib{i}", full_name=f"org{i}/lib{i}",
                 url=f"https://github.com/org{i}/lib{i}",
                 language="Python", added_at=utc_now(), updated_at=utc_now(),
             )
-            test_db.add(repo)
-            test_db.flush()
-            test_db.add(Signal(
+            for i in range(3)
+        ]
+        test_db.add_all(repos)
+        test_db.flush()
+        test_db.add_all(
+            Signal(
                 repo_id=repo.id, signal_type=SignalType.VELOCITY,
                 value=10.0 * (i + 1), calculated_at=utc_now(),
-            ))
+            )
+            for i, repo in enumerate(repos)
+        )
         test_db.commit()
 
         # Without limit — should return all 3